@@ -0,0 +1,191 @@
+"""
+`LiteModel`/`Database`的离线基准测试。
+
+在临时目录中创建数据库并写入合成数据，逐项测量延迟与内存分配，不访问网络，也不触碰`src/data`。
+
+用法：
+    python benchmarks/orm.py
+    python benchmarks/orm.py --rows 1000 100000 1000000 --repeat 50
+"""
+from pathlib import Path
+from typing import Any, Callable
+
+import os
+import sys
+import time
+import pickle
+import random
+import hashlib
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# `src.const.path`以工作目录为基准计算数据目录，切换到临时目录后`src.utils.database`创建的数据库也位于其中
+# 运行结束后删除，见`main`
+TEMPDIR = tempfile.TemporaryDirectory(prefix="inkar-bench-")
+WORKDIR = TEMPDIR.name
+sys.path.insert(0, str(ROOT))
+os.chdir(WORKDIR)
+
+from src.utils.database.lib import Database, LiteModel  # noqa: E402
+from src.utils.database.classes import (  # noqa: E402
+    GroupMessage,
+    GroupSettings,
+    MemberMessage,
+    RequestData,
+    RoleData
+)
+
+SERVERS = ["梦江南", "唯我独尊", "乾坤一掷", "斗转星移", "绝代天骄", "幽月轮", "剑胆琴心", "蝶恋花"]
+SUBSCRIBES = ["日常", "攻防", "世界BOSS", "公告", "开服", "新闻", "技改", "福缘"]
+MESSAGES_PER_MEMBER = 20
+GROUPS = 500
+SEED_BATCH = 5000
+
+def make_role(i: int) -> RoleData:
+    return RoleData(
+        bodyName="成男",
+        campName="浩气盟",
+        forceName="纯阳",
+        globalRoleId=str(10 ** 12 + i),
+        roleName=f"角色{i}",
+        roleId=str(i),
+        serverName=SERVERS[i % len(SERVERS)]
+    )
+
+def make_settings(i: int) -> GroupSettings:
+    return GroupSettings(
+        group_id=str(i),
+        server=SERVERS[i % len(SERVERS)],
+        subscribe=random.sample(SUBSCRIBES, 3),
+        blacklist=[{"name": f"黑名单{i}", "reason": "测试"}]
+    )
+
+def make_message(i: int) -> GroupMessage:
+    return GroupMessage(
+        group_id=i % GROUPS,
+        user_id=i,
+        messages=[MemberMessage(timestamp=1700000000 + j) for j in range(MESSAGES_PER_MEMBER)]
+    )
+
+def make_request(i: int) -> RequestData:
+    return RequestData(
+        key=hashlib.sha1(str(i).encode()).hexdigest(),
+        url=f"https://example.com/api/{i}",
+        params={"id": i},
+        status_code=200,
+        content_type="application/json",
+        response_headers={"content-type": "application/json"},
+        content=random.randbytes(512),
+        timestamp=1700000000 + i
+    )
+
+FACTORIES: dict[str, Callable[[int], LiteModel]] = {
+    "RoleData": make_role,
+    "GroupSettings": make_settings,
+    "GroupMessage": make_message,
+    "RequestData": make_request
+}
+
+def measure(func: Callable[[], Any], repeat: int) -> dict[str, float]:
+    """
+    先计时，再在`tracemalloc`下单独执行一次统计内存分配，避免追踪开销影响延迟。
+
+    Returns:
+        result (dict[str, float]): 延迟的中位数、`p95`（毫秒），单次调用分配的字节数与内存峰值（KiB）。
+    """
+    func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    func()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename") if stat.size_diff > 0)
+    return {
+        "median": statistics.median(timings),
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "allocated": allocated / 1024,
+        "peak": peak / 1024
+    }
+
+def seed(db: Database, name: str, rows: int) -> float:
+    factory = FACTORIES[name]
+    start = time.perf_counter()
+    for offset in range(0, rows, SEED_BATCH):
+        db.save_many(factory(i) for i in range(offset, min(rows, offset + SEED_BATCH)))
+    return time.perf_counter() - start
+
+def cases(db: Database, rows: int) -> dict[str, Callable[[], Any]]:
+    """
+    需要测量的操作，随机参数在每次调用时重新选取。
+    """
+    counter = iter(range(rows, rows * 1000))
+    message = make_message(0)
+    encoded = db._encode(message.dump(by_alias=True)["messages"])
+    legacy = pickle.dumps([pickle.dumps(m.dump()) for m in message.messages])
+    return {
+        "save": lambda: db.save(make_role(next(counter))),
+        "save_many(100)": lambda: db.save_many(make_role(next(counter)) for _ in range(100)),
+        "where_one(RoleData.roleId)": lambda: db.where_one(RoleData(), "roleId = ?", str(random.randrange(rows))),
+        "where_one(RoleData.OR)": lambda: db.where_one(
+            RoleData(), "(roleName = ? OR roleId = ?) AND serverName = ?", f"角色{random.randrange(rows)}", "", random.choice(SERVERS)
+        ),
+        "where_one(RequestData.key)": lambda: db.where_one(
+            RequestData(), "key = ? AND timestamp >= ?", hashlib.sha1(str(random.randrange(rows)).encode()).hexdigest(), 0
+        ),
+        "where_all(GroupMessage.group_id)": lambda: db.where_all(GroupMessage(), "group_id = ?", random.randrange(GROUPS)),
+        "where_all(GroupSettings, 1000)": lambda: db.where_all(GroupSettings(), "id <= 1000"),
+        "select(GroupSettings.group_id)": lambda: db.select(GroupSettings(), ["group_id"]),
+        "count(RoleData)": lambda: db.count(RoleData(), "serverName = ?", random.choice(SERVERS)),
+        "exists(RoleData.roleId)": lambda: db.exists(RoleData(), "roleId = ?", str(random.randrange(rows))),
+        "auto_migrate": lambda: db.auto_migrate(RoleData(), GroupSettings(), GroupMessage(), RequestData()),
+        "encode(messages)": lambda: db._encode(message.dump(by_alias=True)["messages"]),
+        "decode(messages)": lambda: db._decode(encoded),
+        "decode(messages, pickle)": lambda: db._load_legacy(pickle.loads(legacy))
+    }
+
+def report(rows: int, seeded: dict[str, float], results: dict[str, dict[str, float]]) -> None:
+    print(f"\n== {rows} rows ==")
+    print("seed: " + ", ".join(f"{name} {elapsed:.2f}s" for name, elapsed in seeded.items()))
+    print(f"{'operation':<36}{'median ms':>12}{'p95 ms':>12}{'alloc KiB':>12}{'peak KiB':>12}")
+    for name, result in results.items():
+        print(f"{name:<36}{result['median']:>12.3f}{result['p95']:>12.3f}{result['allocated']:>12.1f}{result['peak']:>12.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="LiteModel ORM benchmarks")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100000], help="每个表写入的行数，可指定多个")
+    parser.add_argument("--repeat", type=int, default=30, help="每项操作的计时次数")
+    parser.add_argument("--only", nargs="*", default=None, help="只执行名称包含这些关键字的操作")
+    args = parser.parse_args()
+    random.seed(0)
+    print(f"working directory: {WORKDIR}")
+    try:
+        for rows in args.rows:
+            db = Database(os.path.join(WORKDIR, f"bench-{rows}.db"))
+            try:
+                db.auto_migrate(RoleData(), GroupSettings(), GroupMessage(), RequestData())
+                seeded = {name: seed(db, name, rows) for name in FACTORIES}
+                results = {
+                    name: measure(func, args.repeat)
+                    for name, func in cases(db, rows).items()
+                    if not args.only or any(keyword in name for keyword in args.only)
+                }
+                report(rows, seeded, results)
+            finally:
+                db.close()
+    finally:
+        os.chdir(ROOT)
+        TEMPDIR.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
-from typing import Any, Literal
+from typing import Literal
 from pydantic import BaseModel
 from datetime import datetime, timedelta
 
-from src.utils.database import db
+from src.utils.database.buffer import account_buffer
 from src.utils.database.classes import Account
 from src.utils.time import Time
 
@@ -17,7 +17,7 @@ class CheckinRewards(BaseModel):
 class AccountManage:
     def __init__(self, user_id: int | str):
         self.user_id = user_id
-        self.data: Account | Any = db.where_one(Account(), "user_id = ?", int(user_id), default=Account(user_id=int(user_id)))
+        self.data: Account = account_buffer.get(int(user_id))
     
     @property
     def checkin_counts(self) -> int:
@@ -63,7 +63,7 @@ class AccountManage:
         self.data.checkin_counts += 1
         self._update_last_checkin_data()
 
-        db.save(self.data)
+        account_buffer.put(self.data)
         
         return CheckinRewards(
             total_days=self.checkin_counts,
@@ -75,14 +75,14 @@ class AccountManage:
     def add_coin(self, counts: int) -> None:
         final_coins = self.coins + counts
         self.data.coins = final_coins
-        db.save(self.data)
+        account_buffer.put(self.data)
 
     def reduce_coin(self, counts: int) -> None:
         final_coins = self.coins - counts
         if final_coins < 0:
             final_coins = 0
         self.data.coins = final_coins
-        db.save(self.data)
+        account_buffer.put(self.data)
 
     def _update_last_checkin_data(self):
         current_time = Time().raw_time
@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from typing import Literal
+from pydantic import BaseModel, field_validator
 
 from src.const.path import (
     CONFIG,
@@ -41,11 +42,54 @@ class Jx3Config(BaseModel):
 class Hidden(BaseModel):
     offcial_token: str = ""
 
+class HostLimit(BaseModel):
+    rate: float = 10
+    burst: int = 20
+    concurrency: int = 8
+
+class TransportConfig(BaseModel):
+    mode: Literal["passthrough", "record", "replay"] = "passthrough"
+    fixtures: str = ""
+    latency: float | None = None
+
+DEFAULT_HOST_LIMITS: dict[str, HostLimit] = {
+    "default": HostLimit(),
+    "m.pvp.xoyo.com": HostLimit(rate=5, burst=10, concurrency=4)
+}
+
+class NetworkConfig(BaseModel):
+    limits: dict[str, HostLimit] = DEFAULT_HOST_LIMITS
+    transport: TransportConfig = TransportConfig()
+
+    @field_validator("limits")
+    @classmethod
+    def merge_default_limits(cls, limits: dict[str, HostLimit]) -> dict[str, HostLimit]:
+        # 配置文件中没有列出的主机沿用内置的限制
+        return {**DEFAULT_HOST_LIMITS, **limits}
+
+class RetentionConfig(BaseModel):
+    request_data: int = 604800
+    jx3api_wsdata: int = 2592000
+    group_message: int = 7776000
+
+class DatabaseConfig(BaseModel):
+    retention: RetentionConfig = RetentionConfig()
+
+class MessageConfig(BaseModel):
+    bot: HostLimit = HostLimit(rate=5, burst=10, concurrency=4)
+    group: HostLimit = HostLimit(rate=1, burst=3, concurrency=1)
+    retries: int = 2
+    backoff: float = 1
+    batch: int = 5
+
 class config(BaseModel):
     bot_basic: BotBasic
     github: GitHubConfig
     jx3: Jx3Config
     hidden: Hidden
+    network: NetworkConfig = NetworkConfig()
+    database: DatabaseConfig = DatabaseConfig()
+    message: MessageConfig = MessageConfig()
 
     @classmethod
     def from_yaml(cls, yaml_str: str) -> "config":
@@ -1,5 +1,3 @@
-from typing import Any
-
 from src.utils.database import db
 from src.utils.database.classes import BannedUser
 
@@ -7,11 +5,6 @@ class Ban:
     def __init__(self, user_id: int | str):
         self._user_id = user_id
 
-    @property
-    def _data(self) -> list:
-        data: list[BannedUser] | Any = db.where_all(BannedUser()) or []
-        return data
-
     @property
     def status(self) -> bool:
         """
@@ -20,11 +13,7 @@ class Ban:
         Returns:
             status (bool): 封禁状态。
         """
-        for each_ban in self._data:
-            each_ban: BannedUser
-            if str(each_ban.user_id) == str(self._user_id):
-                return True
-        return False
+        return db.exists(BannedUser(), "user_id = ?", int(self._user_id))
     
     def ban(self, reason: str = "") -> bool:
         """
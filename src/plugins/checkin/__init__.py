@@ -14,6 +14,7 @@ from src.accounts.manage import AccountManage, CheckinRewards
 from src.utils.analyze import sort_dict_list
 from src.utils.database.classes import Account
 from src.utils.database import db
+from src.utils.database.buffer import account_buffer
 from src.utils.permission import check_permission, denied
 from src.utils.analyze import check_number
 from src.utils.generate import generate
@@ -140,6 +141,7 @@ CoinRankMatcher = on_command("金币排行", force_whitespace=True, priority=5)
 async def _(event: GroupMessageEvent, args: Message = CommandArg()):
     if args.extract_plain_text() != "":
         return
+    await account_buffer.a_flush()
     accounts: list[Account] | Any = db.where_all(Account(), default=[])
     accounts_data: list[dict[str, Any]] = sort_dict_list([a.dump() for a in accounts], "coins")[::-1]
     table = []
@@ -46,7 +46,7 @@ async def websocket_client(ws_url: str, headers: dict):
                     logger.info("JX3API 解析成功: " + str(raw_response))
                     parsed = parse_data(response)
                     msg: JX3APIOutputMsg = parsed.msg()
-                    cache_db.save(
+                    await cache_db.a_save(
                         JX3APIWSData(
                             action = response["action"],
                             event = msg.name,
@@ -3,6 +3,7 @@ from nonebot.adapters.onebot.v11 import GroupMessageEvent
 
 from src.utils.nonebot_plugins import scheduler
 from src.utils.database.operation import send_subscribe
+from src.utils.network import background
 
 from .api import get_daily_info
 
@@ -15,12 +16,14 @@ async def _(event: GroupMessageEvent):
     await DailyMatcher.finish(msg)
 
 @scheduler.scheduled_job("cron", hour="8", minute="30")
+@background
 async def run_at_8_30():
     msg = await get_daily_info()
     msg = "早安！音卡为您送上今天的日常：\n" + msg
     await send_subscribe("日常", msg)
 
 @scheduler.scheduled_job("cron", hour="19", minute="30")
+@background
 async def boss():
     if datetime.date.today().weekday() in [2, 4]:
         activity = "世界BOSS（主20:00/分20:05）"
@@ -30,6 +33,7 @@ async def boss():
     await send_subscribe("世界BOSS", msg)
 
 @scheduler.scheduled_job("cron", hour="19", minute="20")
+@background
 async def small_gf():
     if datetime.date.today().weekday() in [1, 3]:
         activity = "逐鹿中原"
@@ -40,6 +44,7 @@ async def small_gf():
 
 @scheduler.scheduled_job("cron", hour="18", minute="20")
 @scheduler.scheduled_job("cron", hour="12", minute="20")
+@background
 async def gf_notice():
     if datetime.date.today().weekday() == 6:
         map = "恶人谷"
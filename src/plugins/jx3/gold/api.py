@@ -16,7 +16,7 @@ token = Config.jx3.api.token
 bot_name = Config.bot_basic.bot_name_argument
 
 async def get_coin_price_image(server: str = ""):
-    data = (await Request("https://spider2.jx3box.com/api/spider/gold/trend").get()).json()
+    data = (await Request("https://spider2.jx3box.com/api/spider/gold/trend").get(expire_at=Time().raw_time + 600, stale_ttl=3600)).json()
     server_data = data[server]
     rows = []
     dates = []
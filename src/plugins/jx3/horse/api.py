@@ -5,7 +5,7 @@ from datetime import datetime, timedelta
 
 async def get_horse_reporter(server: str):  # 数据来源@JX3BOX
     final_url = f"https://next2.jx3box.com/api/game/reporter/horse?type=horse&server={server}"
-    data = (await Request(final_url).get()).json()
+    data = (await Request(final_url).get(expire_at=Time().raw_time + 60, stale_ttl=300)).json()
     if data["data"]["page"]["total"] == 0:
         return "没有找到该服务器信息哦，请检查后重试~"
     for i in data["data"]["list"]:
@@ -67,15 +67,15 @@ async def get_horse_next_spawn(server):
             result += f"\n{horse[:-2]} 将于{time}后刷新"
         ans = result.strip()
         return ans if ans != "" else "时间尚久，无法预知。"
-    ct_data = (await Request(f"https://next2.jx3box.com/api/game/reporter/horse?pageIndex=1&pageSize=50&server={server}&type=chitu-horse&subtype=share_msg").get()).json()
+    ct_data = (await Request(f"https://next2.jx3box.com/api/game/reporter/horse?pageIndex=1&pageSize=50&server={server}&type=chitu-horse&subtype=share_msg").get(expire_at=Time().raw_time + 60, stale_ttl=300)).json()
     chitu_flushed = False
     if is_in_current_cycle(ct_data["data"]["list"][0]["time"]):
         chitu_flushed = True
-    dl_data = (await Request(f"https://next2.jx3box.com/api/game/reporter/horse?pageIndex=1&pageSize=50&server={server}&type=dilu-horse&subtype=share_msg").get()).json()
+    dl_data = (await Request(f"https://next2.jx3box.com/api/game/reporter/horse?pageIndex=1&pageSize=50&server={server}&type=dilu-horse&subtype=share_msg").get(expire_at=Time().raw_time + 60, stale_ttl=300)).json()
     dilu_flushed = False
     if is_in_current_week(dl_data["data"]["list"][0]["time"]):
         dilu_flushed = True
-    web_data = (await Request(f"https://next2.jx3box.com/api/game/reporter/horse?pageIndex=1&pageSize=50&server={server}&type=horse&subtype=npc_chat").get()).json()
+    web_data = (await Request(f"https://next2.jx3box.com/api/game/reporter/horse?pageIndex=1&pageSize=50&server={server}&type=horse&subtype=npc_chat").get(expire_at=Time().raw_time + 60, stale_ttl=300)).json()
     msg = {}
     ft = {}
     maps = ["鲲鹏岛", "阴山大草原", "黑戈壁"]
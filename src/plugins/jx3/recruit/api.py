@@ -28,7 +28,7 @@ async def check_ad(msg: str, data: dict) -> bool:
 @token_required
 async def get_recruit_image(server: str, keyword: str = "", local: bool = False, filter: bool = False, token: str = ""):
     final_url = f"{Config.jx3.api.url}/data/member/recruit?token={token}&server={server}"
-    data = (await Request(final_url).get()).json()
+    data = (await Request(final_url).get(expire_at=Time().raw_time + 60, stale_ttl=300)).json()
     if data["code"] != 200:
         return "唔……未找到相关团队，请检查后重试！"
     adFlags = (await Request("https://inkar-suki.codethink.cn/filters").get()).json()
@@ -151,16 +151,17 @@ class JX3Serendipity:
     @staticmethod
     def save(local_data: list[SerendipityData], remote_data: list[dict], name: str, server: str, uid: str, /):
         local_names = [data.serendipityName for data in local_data]
+        changed_data: list[SerendipityData] = []
         if len(local_data) > 0:
             if local_data[0].roleName != name: # player name changed
                 for data in local_data:
                     data.roleName = name
-                    serendipity_db.save(data)
+                    changed_data.append(data)
         for tp_serendipity in remote_data:
             if tp_serendipity["name"] in local_names:
                 continue
             else:
-                serendipity_db.save(
+                changed_data.append(
                     SerendipityData(
                         roleName=name,
                         roleId=uid,
@@ -169,4 +170,6 @@ class JX3Serendipity:
                         serendipityName=tp_serendipity["name"],
                         time=tp_serendipity["time"]
                     )
-                )
\ No newline at end of file
+                )
+        if changed_data:
+            serendipity_db.save_many(changed_data)
\ No newline at end of file
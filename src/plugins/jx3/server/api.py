@@ -1,4 +1,5 @@
 from src.utils.network import Request
+from src.utils.time import Time
 
 import socket
 
@@ -15,7 +16,7 @@ def tcping(host, port, timeout=3):
 
 
 async def get_server_status(_server: str = "") -> str:
-    servers = (await Request("https://spider2.jx3box.com/api/spider/server/server_state").get()).json()
+    servers = (await Request("https://spider2.jx3box.com/api/spider/server/server_state").get(expire_at=Time().raw_time + 300, stale_ttl=86400)).json()
     for server in servers:
         if server["server_name"] == _server:
             status = tcping(server["ip_address"], int(server["ip_port"]), 1)
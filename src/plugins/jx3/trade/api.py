@@ -1,9 +1,12 @@
 from pathlib import Path
 from jinja2 import Template
 
+from nonebot.log import logger
+
 from src.const.path import ASSETS, build_path
 from src.const.jx3.constant import server_aliases_data as servers
 from src.utils.analyze import check_number
+from src.utils.concurrency import gather_limited
 from src.utils.network import Request
 from src.utils.time import Time
 from src.utils.generate import generate
@@ -13,6 +16,7 @@ from ._parse import coin_to_image, calculator_price
 from ._template import template_msgbox, template_table
 
 import datetime
+import asyncio
 
 filters = ["无封","无皇","封头","封护","封裤","封项","封鞋","封囊", "无修"]
 banned = ["囊","头饰","裤","护臂","腰坠","项链","鞋"]
@@ -168,6 +172,24 @@ async def get_trade_image(server: str, name: str, items: list = []):
         image = await generate(html, ".total", segment=True)
         return image
 
+async def get_server_price_data(item_id: str, server: str, logs_limit: int | None = 20) -> tuple[dict, dict]:
+    """
+    并发获取物品在某个服务器的价格日志与最新报价。
+
+    Args:
+        item_id (str): 物品`ID`。
+        server (str): 服务器。
+        logs_limit (int, None): 价格日志的`limit`参数，为`None`时不传入。
+    """
+    logs_url = f"https://next2.jx3box.com/api/item-price/{item_id}/logs?server={server}"
+    if logs_limit is not None:
+        logs_url += f"&limit={logs_limit}"
+    logs, detail = await asyncio.gather(
+        Request(logs_url).get(),
+        Request(f"https://next2.jx3box.com/api/item-price/{item_id}/detail?server={server}&limit=20").get()
+    )
+    return logs.json(), detail.json()
+
 async def get_trade_image_allserver(name: str):
     table = []
     lows = []
@@ -183,81 +205,69 @@ async def get_trade_image_allserver(name: str):
     itemData = (await Request(f"https://node.jx3box.com/api/node/item/search?ids=&keyword={name}&client=std&per=35").get()).json()
     if itemData["data"]["total"] == 0:
         return "唔……您搜索的物品尚未收录！"
-    final_list = itemData["data"]["data"]
-    for server in servers:
-        itemlist_searchable = []
-        for i in final_list:
-            new = {}
-            if i["BindType"] not in [0, 1, 2, None]:
-                continue
-            id = i["id"]
-            itemAPIData = (await Request(f"https://next2.jx3box.com/api/item-price/{id}/logs?server={server}&limit=20").get()).json()
-            new["data"] = itemAPIData["data"]
-            new["id"] = str(id)
-            new["icon"] = "https://icon.jx3box.com/icon/" + str(i["IconID"]) + ".png"
-            new["name"] = i["Name"]
-            new["quality"] = i["Quality"] if check_number(i["Quality"]) else 0
-            itemlist_searchable.append(new)
-        if len(itemlist_searchable) == 1:
-            currentStatus = 0 # 当日是否具有该物品在交易行
-            yesterdayFlag = False
-            current = itemlist_searchable[0]["data"]["today"]
-            if current is not None:
+    final_list = [i for i in itemData["data"]["data"] if i["BindType"] in [0, 1, 2, None]]
+    if len(final_list) != 1:
+        return "唔……您给出的物品名称似乎不够精准，全服交易行价格查询最好给出准确名称哦！"
+    item = final_list[0]
+    itemId = str(item["id"])
+    icon = "https://icon.jx3box.com/icon/" + str(item["IconID"]) + ".png"
+    quality = item["Quality"] if check_number(item["Quality"]) else 0
+    color = ["(167, 167, 167)", "(255, 255, 255)", "(0, 210, 75)", "(0, 126, 255)", "(254, 45, 254)", "(255, 165, 0)"][quality]
+    results = await gather_limited(
+        [get_server_price_data(itemId, server) for server in servers],
+        limit=8,
+        timeout=30
+    )
+    for server, result in zip(servers, results):
+        if isinstance(result, BaseException):
+            # 单个服务器查询失败不影响其他服务器
+            logger.warning(f"交易行价格查询失败：{server} {result!r}")
+            continue
+        logsData, detailData = result
+        currentStatus = 0 # 当日是否具有该物品在交易行
+        yesterdayFlag = False
+        current = logsData["data"]["today"]
+        if current is not None:
+            currentStatus = 1
+        else:
+            if logsData["data"]["yesterday"] is not None:
+                yesterdayFlag = True
                 currentStatus = 1
+                current = logsData["data"]["yesterday"] 
             else:
-                if itemlist_searchable[0]["data"]["yesterday"] is not None:
-                    yesterdayFlag = True
-                    currentStatus = 1
-                    current = itemlist_searchable[0]["data"]["yesterday"] 
-                else:
-                    yesterdayFlag = 0
-                    currentStatus = 0
-            if currentStatus:
-                highs.append(current["HighestPrice"])
-                avgs.append(current["AvgPrice"])
-                lows.append(current["LowestPrice"])
+                yesterdayFlag = 0
+                currentStatus = 0
+        if currentStatus:
+            highs.append(current["HighestPrice"])
+            avgs.append(current["AvgPrice"])
+            lows.append(current["LowestPrice"])
+        else:
+            highs.append(0)
+            avgs.append(0)
+            lows.append(0)
+        if (not currentStatus or yesterdayFlag) and detailData["data"]["prices"] is None:
+            if not yesterdayFlag:
+                continue
             else:
-                highs.append(0)
-                avgs.append(0)
-                lows.append(0)
-            color = ["(167, 167, 167)", "(255, 255, 255)", "(0, 210, 75)", "(0, 126, 255)", "(254, 45, 254)", "(255, 165, 0)"][itemlist_searchable[0]["quality"]]
-            itemId = itemlist_searchable[0]["id"]
-            icon = itemlist_searchable[0]["icon"]
-            detailData = (await Request(f"https://next2.jx3box.com/api/item-price/{itemId}/detail?server={server}&limit=20").get()).json()
-            if (not currentStatus or yesterdayFlag) and detailData["data"]["prices"] is None:
-                if not yesterdayFlag:
-                    # table.append(Template(template_table).render(
-                    #         icon=icon,
-                    #         color=color,
-                    #         name=f"{name}（{server}）",
-                    #         time=Time().format("%m月%d日 %H:%M:%S"),
-                    #         limit="N/A",
-                    #         price="<span style=\"color:red\">没有数据</span>"
-                    #     )
-                    # )
-                    continue
-                else:
-                    table.append(Template(template_table).render(
-                            icon=icon,
-                            color=color,
-                            name=f"{name}（{server}）",
-                            time=Time().format("%m月%d日 %H:%M:%S"),
-                            limit="N/A",
-                            price=coin_to_image(str(calculator_price(current["AvgPrice"])))
-                        )
+                table.append(Template(template_table).render(
+                        icon=icon,
+                        color=color,
+                        name=f"{name}（{server}）",
+                        time=Time().format("%m月%d日 %H:%M:%S"),
+                        limit="N/A",
+                        price=coin_to_image(str(calculator_price(current["AvgPrice"])))
                     )
-                    continue
-            table.append(Template(template_table).render(
-                    icon=itemlist_searchable[0]["icon"],
-                    color=color,
-                    name=itemlist_searchable[0]["name"] + f"（{server}）",
-                    time=Time().format("%m月%d日 %H:%M:%S"),
-                    limit=str(detailData["data"]["prices"][0]["n_count"]),
-                    price=coin_to_image(str(calculator_price(detailData["data"]["prices"][0]["unit_price"])))
                 )
+                continue
+        table.append(Template(template_table).render(
+                icon=icon,
+                color=color,
+                name=item["Name"] + f"（{server}）",
+                time=Time().format("%m月%d日 %H:%M:%S"),
+                limit=str(detailData["data"]["prices"][0]["n_count"]),
+                price=coin_to_image(str(calculator_price(detailData["data"]["prices"][0]["unit_price"])))
             )
-        else:
-            return "唔……您给出的物品名称似乎不够精准，全服交易行价格查询最好给出准确名称哦！"
+        )
     fhighs = [x for x in highs if x != 0]
     favgs = [x for x in avgs if x != 0]
     flows = [x for x in lows if x != 0]
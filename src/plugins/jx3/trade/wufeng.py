@@ -1,15 +1,17 @@
 from jinja2 import Template
 
 from nonebot.adapters.onebot.v11 import MessageSegment as ms
+from nonebot.log import logger
 
 from src.const.path import ASSETS, build_path
 from src.const.jx3.constant import server_aliases_data as servers
 from src.utils.network import Request
+from src.utils.concurrency import gather_limited
 from src.utils.time import Time
 from src.utils.generate import generate
 from src.templates import SimpleHTML
 
-from .api import template_msgbox, template_table
+from .api import template_msgbox, template_table, get_server_price_data
 
 from ._parse import AttrsConverter, coin_to_image, calculator_price
 
@@ -56,7 +58,7 @@ async def get_wufeng_image(raw: str, server: str):
     try:
         data = await get_equip_data(raw)
     except ValueError:
-        emg = (await Request("https://inkar-suki.codethink.cn/Inkar-Suki-Docs/img/emoji.jpg").get()).content
+        emg = (await Request("https://inkar-suki.codethink.cn/Inkar-Suki-Docs/img/emoji.jpg").get(expire_at=Time().raw_time + 86400)).content
         return "音卡建议您不要造装备了，因为没有。\n" + ms.image(emg)
     if isinstance(data, list):
         return data[0]
@@ -64,7 +66,7 @@ async def get_wufeng_image(raw: str, server: str):
     try:
         itemId = data["id"]
     except:
-        emg = (await Request("https://inkar-suki.codethink.cn/Inkar-Suki-Docs/img/emoji.jpg").get()).content
+        emg = (await Request("https://inkar-suki.codethink.cn/Inkar-Suki-Docs/img/emoji.jpg").get(expire_at=Time().raw_time + 86400)).content
         return "音卡建议您不要造装备了，因为没有。\n" + ms.image(emg)
     logs = (await Request(f"https://next2.jx3box.com/api/item-price/{itemId}/logs?server={server}").get()).json()
     current = logs["data"]["today"]
@@ -136,10 +138,22 @@ async def get_wufeng_image_allserver(raw: str):
     try:
         itemId = data["id"]
     except KeyError:
-        emg = (await Request("https://inkar-suki.codethink.cn/Inkar-Suki-Docs/img/emoji.jpg").get()).content
+        emg = (await Request("https://inkar-suki.codethink.cn/Inkar-Suki-Docs/img/emoji.jpg").get(expire_at=Time().raw_time + 86400)).content
         return "音卡建议您不要造无修装备了，因为没有。\n" + ms.image(emg)
-    for server in servers:
-        logs = (await Request(f"https://next2.jx3box.com/api/item-price/{itemId}/logs?server={server}").get()).json()
+    color = ["(167, 167, 167)", "(255, 255, 255)", "(0, 210, 75)", "(0, 126, 255)", "(254, 45, 254)", "(255, 165, 0)"][data["Quality"]]
+    icon = "https://icon.jx3box.com/icon/" + str(data["IconID"]) + ".png"
+    name = data["Name"]
+    results = await gather_limited(
+        [get_server_price_data(itemId, server, None) for server in servers],
+        limit=8,
+        timeout=30
+    )
+    for server, result in zip(servers, results):
+        if isinstance(result, BaseException):
+            # 单个服务器查询失败不影响其他服务器
+            logger.warning(f"无封交易行价格查询失败：{server} {result!r}")
+            continue
+        logs, detailData = result
         current = logs["data"]["today"]
         yesterdayFlag = False
         if current != None:
@@ -160,22 +174,8 @@ async def get_wufeng_image_allserver(raw: str):
             highs.append(0)
             avgs.append(0)
             lows.append(0)
-        color = ["(167, 167, 167)", "(255, 255, 255)", "(0, 210, 75)", "(0, 126, 255)", "(254, 45, 254)", "(255, 165, 0)"][data["Quality"]]
-        detailData = (await Request(f"https://next2.jx3box.com/api/item-price/{itemId}/detail?server={server}&limit=20").get()).json()
-        icon = "https://icon.jx3box.com/icon/" + str(data["IconID"]) + ".png"
-        name = data["Name"]
         if (not currentStatus or yesterdayFlag) and detailData["data"]["prices"] is None:
             if not yesterdayFlag:
-                # table.append(
-                #     Template(template_table).render(
-                #         icon = icon,
-                #         color = color,
-                #         name = name + f"（{server}）<br><span style=\"color:rgb(0, 210, 75)\">" + " ".join(get_exist_attrs(data["attributes"])) + "</span>",
-                #         time = Time().format("%m月%d日 %H:%M:%S"),
-                #         limit = "N/A",
-                #         price = "<span style=\"color:red\">没有数据</span>"
-                #     )
-                # )
                 continue
             else:
                 table.append(
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from nonebot.log import logger
 
 from src.utils.database.operation import send_subscribe
+from src.utils.network import background
 
 import asyncio
 
@@ -21,6 +22,7 @@ async def execute_on_new_post(post):
     logger.info({"data": data})
     await send_subscribe("咸鱼", f"@剑网3余玉贤 发表了新微博：\n{data}\nhttps://weibo.com/u/2046281757")
 
+@background
 async def poll_weibo_api(uid, interval=60):
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
@@ -1,6 +1,5 @@
-from typing import Any
-
 from nonebot import on_command
+from nonebot.log import logger
 from nonebot.adapters.onebot.v11 import (
     GroupMessageEvent,
     MessageEvent,
@@ -17,13 +16,18 @@ from src.const.path import (
     build_path
 )
 from src.utils.network import Request
+from src.utils.network.breaker import circuit_breaker
+from src.utils.network.cache import response_cache
+from src.utils.outbound import outbound_queue
 from src.utils.time import Time
 from src.utils.permission import check_permission, denied
-from src.utils.database import db
-from src.utils.database.classes import GroupSettings, Account
-from src.utils.database.operation import get_groups, get_group_settings
+from src.utils.database.classes import Account
+from src.utils.database.operation import get_groups, get_group_settings, reset_group_settings
+from src.utils.database.maintenance import maintain_cache_db
+from src.utils.database.buffer import account_buffer
 from src.utils.message import post_process
 from src.utils.exceptions import ConnectTimeout
+from src.utils.nonebot_plugins import scheduler
 from src.utils.message import message_universal
 
 from ._message import leave_msg
@@ -79,9 +83,7 @@ async def _(bot: Bot, event: GroupMessageEvent, confirm: Message = Arg()):
     u_input = confirm.extract_plain_text()
     if u_input == "重置音卡":
         group_id = str(event.group_id)
-        group_settings: GroupSettings | Any = db.where_one(GroupSettings(), "group_id = ?", group_id, default=None)
-        group_settings = GroupSettings(id=group_settings.id, group_id=group_settings.group_id)
-        db.save(group_settings)
+        reset_group_settings(group_id)
         await DismissMatcher.send("重置成功！可以重新开始绑定本群数据了！")
 
 github_token = Config.github.github_personal_token
@@ -175,12 +177,61 @@ async def _(bot: Bot, event: MessageEvent, full_argument: Message = CommandArg()
     if user_id in Config.bot_basic.bot_owner and str(event.user_id) not in Config.bot_basic.bot_owner:
         await AdminMatcher.finish("无法修改Bot主人的权限！")
     level = args[1]
-    data: Account | Any = db.where_one(Account(), "user_id = ?", int(user_id), default=Account(user_id=int(user_id)))
+    data: Account = account_buffer.get(int(user_id))
     raw_permission = data.permission
     data.permission = int(level)
-    db.save(data)
+    account_buffer.put(data)
     await AdminMatcher.finish(f"用户（{user_id}）的权限等级已变更！\n{raw_permission} -> {level}")
 
+NetworkStatusMatcher = on_command("network_status", aliases={"网络状态"}, force_whitespace=True, priority=5)
+
+@NetworkStatusMatcher.handle()
+async def _(event: MessageEvent, args: Message = CommandArg()):
+    if args.extract_plain_text() != "":
+        return
+    if not check_permission(str(event.user_id), 10):
+        await NetworkStatusMatcher.finish(denied(10))
+    states = {"closed": "正常", "open": "熔断", "half_open": "探测中"}
+    msg = []
+    for health in circuit_breaker.hosts():
+        p95 = health.percentile(95)
+        msg.append(
+            f"{health.host}\n"
+            f"状态：{states[health.state]} | 失败：{health.total_failures}/{health.total_requests} | "
+            f"p95：{'N/A' if p95 is None else f'{p95:.2f}s'} | 超时：{health.timeout(20):.2f}s"
+        )
+    stats = response_cache.stats()
+    msg.append(f"缓存：{stats['size']}条 {stats['bytes'] / 1024 / 1024:.1f}MiB | 命中 {stats['hits']} | 磁盘 {stats['disk_hits']} | 过期 {stats['stale_hits']} | 未命中 {stats['misses']} | 淘汰 {stats['evictions']}")
+    queue = outbound_queue.stats()
+    p95 = outbound_queue.percentile(95)
+    msg.append(
+        f"消息队列：排队 {queue['waiting']} | 已发送 {queue['sent']} | 合并 {queue['batched']} | 失败 {queue['failed']} | 重试 {queue['retried']} | "
+        f"p95：{'N/A' if p95 is None else f'{p95:.2f}s'}"
+    )
+    await NetworkStatusMatcher.finish("\n".join(msg))
+
+def format_maintenance_report(report: dict[str, int]) -> str:
+    return (
+        f"请求缓存：{report['request_data']}条 | 推送记录：{report['jx3api_wsdata']}条 | 发言记录：{report['group_message']}条\n"
+        f"回收空间：{report['reclaimed'] / 1024:.1f}KiB"
+    )
+
+@scheduler.scheduled_job("cron", hour="4", minute="30")
+async def cache_db_maintenance():
+    report = await maintain_cache_db()
+    logger.info("缓存数据库维护完成：" + format_maintenance_report(report).replace("\n", " | "))
+
+DatabaseMaintenanceMatcher = on_command("db_maintenance", aliases={"数据库维护"}, force_whitespace=True, priority=5)
+
+@DatabaseMaintenanceMatcher.handle()
+async def _(event: MessageEvent, args: Message = CommandArg()):
+    if args.extract_plain_text() != "":
+        return
+    if not check_permission(str(event.user_id), 10):
+        await DatabaseMaintenanceMatcher.finish(denied(10))
+    report = await maintain_cache_db()
+    await DatabaseMaintenanceMatcher.finish("缓存数据库维护完成！\n" + format_maintenance_report(report))
+
 @post_process
 async def _(bot: Bot, event: MessageEvent, exception: None | Exception, cmd = RawCommand()):
     if cmd is None:
@@ -17,8 +17,10 @@ from nonebot.params import CommandArg
 from src.config import Config
 from src.utils.permission import check_permission, denied
 from src.utils.database import db
-from src.utils.database.classes import BannedUser, Applicationslist, GroupSettings
+from src.utils.database.classes import BannedUser, Applicationslist
 from src.utils.database.operation import get_group_settings, set_group_settings
+from src.utils.membership import group_registry
+from src.utils.outbound import outbound_queue
 
 from src.plugins.ban.process import Ban
 
@@ -31,6 +33,8 @@ notice = on_notice(priority=5)
 @notice.handle()
 async def _(bot: Bot, event: GroupIncreaseNoticeEvent):
     """入群自动发送帮助信息。"""
+    if event.user_id == event.self_id:
+        group_registry.add(str(event.self_id), event.group_id)
     obj = event.user_id
     group = event.group_id
     bots = notice_to
@@ -39,12 +43,11 @@ async def _(bot: Bot, event: GroupIncreaseNoticeEvent):
         if not isinstance(welcome_msg, str):
             return
         msg = ms.at(obj) + " " + welcome_msg
-        await bot.call_api("send_group_msg", group_id=group, message=msg)
+        await outbound_queue.send_group_msg(bot, group, msg)
         return
-    await bot.call_api("send_group_msg", group_id=event.group_id, message=self_enter_msg.replace("$GROUP_ID", str(event.group_id)))
+    await outbound_queue.send_group_msg(bot, event.group_id, self_enter_msg.replace("$GROUP_ID", str(event.group_id)))
     group_id = str(event.group_id)
-    new_settings = GroupSettings(group_id=group_id)
-    db.save(new_settings)
+    get_group_settings(group_id) # 没有设置时创建默认设置
 
 async def notice_and_ban(bot: Bot, event: GroupDecreaseNoticeEvent | GroupBanNoticeEvent, action: str):
     message = f"唔……{Config.bot_basic.bot_name}在群聊（{event.group_id}）被{action}啦！\n操作者：{event.operator_id}，已自动封禁！"
@@ -53,7 +56,7 @@ async def notice_and_ban(bot: Bot, event: GroupDecreaseNoticeEvent | GroupBanNot
         return
     banlist_obj: BannedUser = BannedUser(user_id=event.operator_id, reason="T")
     db.save(banlist_obj)
-    await bot.call_api("send_group_msg", group_id=int(notice[str(event.self_id)]), message=message)
+    await outbound_queue.send_group_msg(bot, int(notice[str(event.self_id)]), message)
 
 @notice.handle()
 async def _(bot: Bot, event: GroupBanNoticeEvent):
@@ -71,6 +74,8 @@ async def _(bot: Bot, event: GroupDecreaseNoticeEvent):
     """移出"""
     if not event.notice_type == "group_decrease":
         return
+    if event.user_id == event.self_id:
+        group_registry.remove(str(event.self_id), event.group_id)
     if event.sub_type != "kick_me":
         return
     await notice_and_ban(bot, event, "移出")
@@ -107,7 +112,7 @@ async def _(bot: Bot, event: GroupRequestEvent):
         applications_data.applications_list = applications_list
         db.save(applications_data)
         msg = f"收到新的加群申请：\n邀请人：{user}\n群号：{group}"
-        await bot.call_api("send_group_msg", group_id=int(notice_to[str(event.self_id)]), message=msg)
+        await outbound_queue.send_group_msg(bot, int(notice_to[str(event.self_id)]), msg)
 
 
 WelcomeEditMatcher = on_command("welcome", aliases={"修改欢迎语"}, force_whitespace=True, priority=5)
@@ -1,4 +1,3 @@
-from typing import Any
 from jinja2 import Template
 from pathlib import Path
 from datetime import datetime
@@ -14,13 +13,14 @@ from nonebot.adapters.onebot.v11 import (
 
 from src.utils.message import message_universal
 from src.utils.database import cache_db
+from src.utils.database.buffer import group_message_buffer
 from src.utils.database.classes import GroupMessage, MemberMessage
 from src.utils.time import Time
 from src.utils.network import Request
 from src.utils.generate import generate
 from src.templates import HTMLSourceCode
 
-from .utils import get_date_timestamp
+from .utils import get_date_timestamp, count_group_messages
 from ._template import template_body, table_head
 
 today_message_count = on_command("today_message_count", aliases={"本群发言统计"}, priority=5)
@@ -30,28 +30,24 @@ async def _(bot: Bot, event: GroupMessageEvent, args: Message = CommandArg()):
     start, end = get_date_timestamp(args.extract_plain_text())
     if args.extract_plain_text() == "all":
         start, end = (0, int(datetime.now().timestamp()))
-    group_data: list[GroupMessage] | Any = cache_db.where_all(GroupMessage(), "group_id = ?", event.group_id, default=[])
-    if len(group_data) == 0:
+    await group_message_buffer.a_flush()
+    counts = await cache_db.a_read(count_group_messages, event.group_id, start, end)
+    if len(counts) == 0:
         await today_message_count.finish("唔……目前没有任何发言记录！")
     group_member_data: list[dict] = await bot.call_api("get_group_member_list", group_id=event.group_id)
     data = dict(
         sorted(
-            {
-                str(m.user_id): [d for d in m.messages if start <= d.timestamp <= end] 
-                for m
-                in group_data
-            }.items(),
-            key=lambda item: len(item[1]),
+            counts.items(),
+            key=lambda item: item[1],
             reverse=True
         )
     )
-    if all(value == [] for value in data.values()):
+    if all(value == 0 for value in data.values()):
         await today_message_count.finish("唔……没有该时间段的发言记录！")
     num = 0
     table = []
     for each_data in data.items():
-        user_id, msgs = each_data
-        msg_count = len(msgs)
+        user_id, msg_count = each_data
         if msg_count == 0:
             continue
         member_data: list[dict] = [g for g in group_member_data if g["user_id"] == int(user_id)]
@@ -86,19 +82,8 @@ async def _(bot: Bot, event: GroupMessageEvent, args: Message = CommandArg()):
 
 @message_universal.handle()
 async def _(event: GroupMessageEvent):
-    group_data: GroupMessage | Any = cache_db.where_one(
-        GroupMessage(),
-        "group_id = ? AND user_id = ?",
-        event.group_id,
-        event.user_id,
-        default=GroupMessage(
-            group_id=event.group_id,
-            user_id=event.user_id
-        )
-    )
-    msg_list = group_data.messages
-    msg_list.append(
+    group_data: GroupMessage = await group_message_buffer.a_get(event.group_id, event.user_id)
+    group_data.messages.append(
         MemberMessage(timestamp=Time().raw_time)
     )
-    group_data.messages = msg_list
-    cache_db.save(group_data)
\ No newline at end of file
+    group_message_buffer.put(group_data)
\ No newline at end of file
@@ -1,6 +1,10 @@
-import time
 from datetime import datetime
 
+from src.utils.database import cache_db
+from src.utils.database.classes import GroupMessage
+
+import time
+
 def get_date_timestamp(date_str: str) -> tuple[int, int]:
     current_year = datetime.now().year
     try:
@@ -14,4 +18,22 @@ def get_date_timestamp(date_str: str) -> tuple[int, int]:
         end_time = datetime(today.year, today.month, today.day, 23, 59, 59)
     start_timestamp = int(time.mktime(start_time.timetuple()))
     end_timestamp = int(time.mktime(end_time.timetuple()))
-    return start_timestamp, end_timestamp
\ No newline at end of file
+    return start_timestamp, end_timestamp
+
+def count_group_messages(group_id: int, start: int, end: int) -> dict[str, int]:
+    """
+    逐批读取群聊的发言记录，统计每个成员在时间段内的发言数。
+
+    Args:
+        group_id (int): 群号。
+        start (int): 起始时间戳。
+        end (int): 结束时间戳。
+
+    Returns:
+        counts (dict[str, int]): 成员`uin`到发言数的映射，包含该时间段内没有发言的成员。
+    """
+    counts: dict[str, int] = {}
+    # 调用前需要先写入 group_message_buffer 中的记录
+    for member in cache_db.iter_where(GroupMessage(), "group_id = ?", group_id):
+        counts[str(member.user_id)] = len([m for m in member.messages if start <= m.timestamp <= end])
+    return counts
\ No newline at end of file
@@ -0,0 +1,39 @@
+from typing import Awaitable, Iterable, TypeVar
+
+import asyncio
+
+T = TypeVar("T")
+
+async def gather_limited(
+    aws: Iterable[Awaitable[T]],
+    limit: int = 8,
+    timeout: float | None = None,
+    return_exceptions: bool = True
+) -> list[T | BaseException]:
+    """
+    以有限的并发数执行一组可等待对象，结果顺序与传入顺序一致。
+
+    Args:
+        aws (Iterable[Awaitable[T]]): 需要执行的可等待对象（如协程）。
+        limit (int): 同时执行的最大数量，默认为`8`。
+        timeout (float, None): 单个任务的超时时间，单位`seconds`，从该任务开始执行时计算，超时时结果为`asyncio.TimeoutError`。
+        return_exceptions (bool): 为`True`时单个任务的异常作为结果返回，不影响其他任务；为`False`时抛出第一个异常并取消其余任务。
+
+    Returns:
+        results (list[T | BaseException]): 每个任务的结果或异常。
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(aw: Awaitable[T]) -> T:
+        async with semaphore:
+            if timeout is None:
+                return await aw
+            return await asyncio.wait_for(aw, timeout)
+
+    tasks = [asyncio.ensure_future(run(aw)) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
@@ -0,0 +1,194 @@
+from concurrent.futures import Future
+from typing import Any, Generic, TypeVar
+
+from nonebot import get_driver
+from nonebot.log import logger
+
+from src.utils.database import db, cache_db
+from src.utils.database.lib import Database, LiteModel
+from src.utils.database.classes import Account, GroupMessage
+
+import asyncio
+
+M = TypeVar("M", bound=LiteModel)
+
+class WriteBuffer(Generic[M]):
+    """
+    高频写入的合并缓冲（`write-behind`）。
+
+    数据模型按`fields`组成的键缓存在内存中，修改后调用`put`标记，
+    每隔`flush_interval`秒或累计`max_pending`个键时，在写线程中以同一事务写入。
+    尚未写入完成的数据模型会直接由`get`返回，保证读到最新的修改。
+    """
+    def __init__(
+        self,
+        database: Database,
+        model: type[M],
+        fields: tuple[str, ...],
+        flush_interval: float = 0.5,
+        max_pending: int = 256
+    ):
+        """
+        Args:
+            database (Database): 写入的数据库。
+            model (type[M]): 数据模型类型。
+            fields (tuple[str, ...]): 唯一确定一行的字段，同时用于查询与构造默认值。
+            flush_interval (float): 第一次修改后等待写入的时间，单位`seconds`。
+            max_pending (int): 待写入的键达到该数量时立即写入。
+        """
+        self.database = database
+        self.model = model
+        self.fields = fields
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.condition = " AND ".join(f"{field} = ?" for field in fields)
+        self._entries: dict[tuple, M] = {}
+        self._pending: set[tuple] = set()
+        self._inflight: dict[tuple, int] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+    def get(self, *key: Any) -> M:
+        """
+        获取数据模型，缓冲中没有时从数据库读取，数据库中也没有时构造默认值。
+
+        Args:
+            *key (Any): 与`fields`一一对应的值。
+
+        Returns:
+            model (M): 修改后需要调用`put`，获取与`put`之间不应有`await`。
+        """
+        model = self._entries.get(key)
+        if model is None:
+            model = self.database.where_one(self.model(), self.condition, *key, default=None)
+        return model if model is not None else self._default(key)
+
+    async def a_get(self, *key: Any) -> M:
+        """
+        同`get`，数据库的读取在读连接中进行。
+        """
+        model = self._entries.get(key)
+        if model is None:
+            model = await self.database.a_where_one(self.model(), self.condition, *key, default=None)
+            # 等待期间可能已有其他修改进入缓冲
+            model = self._entries.get(key, model)
+        return model if model is not None else self._default(key)
+
+    def put(self, model: M) -> None:
+        """
+        标记数据模型已修改，稍后写入。
+
+        Args:
+            model (M): 通过`get`或`a_get`获取并修改后的数据模型。
+        """
+        key = tuple(getattr(model, field) for field in self.fields)
+        self._entries[key] = model
+        self._pending.add(key)
+        if len(self._pending) >= self.max_pending:
+            self.flush()
+        elif self._flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.flush()
+            else:
+                self._flush_handle = loop.call_later(self.flush_interval, self.flush)
+
+    def flush(self) -> Future | None:
+        """
+        将待写入的数据模型交给写线程。
+
+        Returns:
+            future (Future, None): 写入完成时完成，没有待写入的数据时为`None`。
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return None
+        keys = list(self._pending)
+        self._pending.clear()
+        # 写线程中序列化的是快照，之后的修改不会与其冲突
+        snapshots = [self._entries[key].model_copy(deep=True) for key in keys]
+        for key in keys:
+            self._inflight[key] = self._inflight.get(key, 0) + 1
+        future = self.database.submit(self._write, snapshots)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._written(keys, snapshots, future.exception())
+        else:
+            asyncio.wrap_future(future).add_done_callback(lambda f: self._written(keys, snapshots, f.exception()))
+        return future
+
+    async def a_flush(self) -> None:
+        """
+        写入所有待写入的数据模型并等待完成。
+        """
+        future = self.flush()
+        if future is not None:
+            await asyncio.wrap_future(future)
+
+    def _write(self, snapshots: list[M]) -> None:
+        with self.database.transaction():
+            for model in snapshots:
+                if model.id is None:
+                    # 上一次写入插入的行可能还没有把 id 回写到缓冲中，按键查找已有的行，避免重复插入
+                    row = self.database.select(self.model(), ["id"], self.condition + " LIMIT 1", *(getattr(model, field) for field in self.fields))
+                    if row:
+                        model.id = row[0].id
+            self.database.save_many([model for model in snapshots if model.id is not None])
+            # 新插入的行需要取得 id，之后的写入才会覆盖同一行
+            self.database.save(*[model for model in snapshots if model.id is None])
+
+    def _written(self, keys: list[tuple], snapshots: list[M], exception: BaseException | None = None) -> None:
+        if exception is not None:
+            logger.error(f"{self.model.__name__} 缓冲写入失败，丢弃 {len(keys)} 条修改：{exception!r}")
+        for key, snapshot in zip(keys, snapshots):
+            model = self._entries.get(key)
+            if model is not None and model.id is None:
+                model.id = snapshot.id
+            self._inflight[key] -= 1
+            if self._inflight[key] == 0:
+                del self._inflight[key]
+                if key not in self._pending:
+                    self._entries.pop(key, None)
+
+    def _default(self, key: tuple) -> M:
+        return self.model(**dict(zip(self.fields, key)))
+
+class GroupMessageBuffer(WriteBuffer[GroupMessage]):
+    """
+    群聊发言记录的缓冲，写入时丢弃早于`cutoff`的发言。
+
+    维护任务清理数据库后，缓冲中仍可能有在清理前读取的记录，
+    由`cutoff`保证这些记录写回时不会恢复已清理的发言。
+    """
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.cutoff = 0
+
+    def prune(self, before: int) -> None:
+        """
+        设置`cutoff`，并清理缓冲中早于`before`的发言。
+
+        Args:
+            before (int): 截止时间戳。
+        """
+        self.cutoff = max(self.cutoff, before)
+        for model in self._entries.values():
+            model.messages = [m for m in model.messages if m.timestamp >= self.cutoff]
+
+    def _write(self, snapshots: list[GroupMessage]) -> None:
+        for model in snapshots:
+            model.messages = [m for m in model.messages if m.timestamp >= self.cutoff]
+        super()._write(snapshots)
+
+account_buffer = WriteBuffer(db, Account, ("user_id",))
+group_message_buffer = GroupMessageBuffer(cache_db, GroupMessage, ("group_id", "user_id"))
+
+driver = get_driver()
+
+@driver.on_shutdown
+async def flush_write_buffers():
+    for buffer in (account_buffer, group_message_buffer):
+        await buffer.a_flush()
@@ -1,7 +1,10 @@
+from collections import Counter
+
 from src.utils.database.lib import LiteModel
 
 class Account(LiteModel):
     TABLE_NAME: str = "accounts"
+    UNIQUE_INDEXES = (("user_id",),)
     user_id: int = 0
     checkin_counts: int = 0
     coins: int = 0
@@ -10,6 +13,7 @@ class Account(LiteModel):
 
 class Affections(LiteModel):
     TABLE_NAME: str = "affections"
+    INDEXES = (("uin_1",), ("uin_2",))
     server: str = ""
     uin_1: int = 0
     uin_2: int = 0
@@ -25,11 +29,13 @@ class Applicationslist(LiteModel):
 
 class BannedUser(LiteModel):
     TABLE_NAME: str = "ban"
+    INDEXES = (("user_id",),)
     user_id: int = 0
     reason: str = ""    
 
 class GroupSettings(LiteModel):
     TABLE_NAME: str = "settings"
+    UNIQUE_INDEXES = (("group_id",),)
     server: str = ""
     group_id: str = ""
     subscribe: list[str] = []
@@ -42,11 +48,13 @@ class GroupSettings(LiteModel):
 
 class ItemKeywordMap(LiteModel):
     TABLE_NAME: str = "item_keyword"
+    INDEXES = (("map_name",), ("raw_name",))
     map_name: str = ""
     raw_name: str = ""
 
 class JX3APIWSData(LiteModel):
     TABLE_NAME: str = "jx3api_wsdata"
+    INDEXES = (("timestamp",),)
     action: int = 0
     event: str = ""
     data: dict = {}
@@ -58,14 +66,21 @@ class Population(LiteModel):
 
 class RequestData(LiteModel):
     TABLE_NAME: str = "request_data"
+    INDEXES = (("key", "timestamp"), ("url",), ("timestamp",))
+    key: str = ""
     url: str = ""
     headers: dict = {}
     params: dict = {}
-    response_data: str = ""
+    status_code: int = 0
+    content_type: str = ""
+    response_headers: dict = {}
+    encoding: str = ""
+    content: bytes = b""
     timestamp: int = 0
 
 class RoleData(LiteModel):
     TABLE_NAME: str = "role_data"
+    INDEXES = (("roleId",), ("serverName", "roleName"))
     bodyName: str = ""
     campName: str = ""
     forceName: str = ""
@@ -76,6 +91,7 @@ class RoleData(LiteModel):
 
 class SerendipityData(LiteModel):
     TABLE_NAME: str = "serendipities"
+    INDEXES = (("server", "roleId"), ("server", "roleName"))
     roleName: str = ""
     roleId: str = ""
     level: int = 0
@@ -88,6 +104,21 @@ class MemberMessage(LiteModel):
 
 class GroupMessage(LiteModel):
     TABLE_NAME: str = "group_message"
+    UNIQUE_INDEXES = (("group_id", "user_id"),)
     group_id: int = 0
     user_id: int = 0
-    messages: list[MemberMessage] = []
\ No newline at end of file
+    messages: list[MemberMessage] = []
+
+    @classmethod
+    def merge(cls, rows: list["GroupMessage"]) -> "GroupMessage": # type: ignore
+        """
+        合并同一成员的多行发言记录。
+
+        重复的行通常是同一份记录在不同时刻的快照，彼此重叠，
+        因此每个时间戳保留各行中出现次数的最大值，而不是简单拼接。
+        """
+        counts: Counter[int] = Counter()
+        for row in rows:
+            counts |= Counter(m.timestamp for m in row.messages)
+        messages = [MemberMessage(timestamp=timestamp) for timestamp in sorted(counts.elements())]
+        return cls(group_id=rows[0].group_id, user_id=rows[0].user_id, messages=messages)
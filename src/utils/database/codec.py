@@ -0,0 +1,67 @@
+"""
+`Database`中列表、字典等字段的序列化格式。
+
+编码结果的第一个字节为格式版本，其余部分为对应编码器的输出；
+旧版本使用`pickle`储存，其首字节固定为`0x80`，读取时仍然兼容。
+"""
+from abc import ABC, abstractmethod
+from typing import Any
+
+import json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+FOREIGN_FLAG = 0x10
+"""
+版本字节中的标志位，表示数据中包含需要解析的外键。
+"""
+
+LEGACY_HEADER = 0x80
+"""
+`pickle`（协议版本`2`及以上）数据的首字节。
+"""
+
+class Codec(ABC):
+    """
+    编码器，子类需要提供唯一的`VERSION`。
+    """
+    VERSION: int = 0
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        ...
+
+    @abstractmethod
+    def loads(self, data: bytes | memoryview) -> Any:
+        ...
+
+class MsgpackCodec(Codec):
+    """
+    `MessagePack`编码，体积小，解码为单次`C`调用。
+    """
+    VERSION = 0x01
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True) # type: ignore
+
+    def loads(self, data: bytes | memoryview) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False) # type: ignore
+
+class JsonCodec(Codec):
+    """
+    紧凑的`JSON`编码，不支持`bytes`。
+    """
+    VERSION = 0x02
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: bytes | memoryview) -> Any:
+        return json.loads(bytes(data))
+
+CODECS: dict[int, Codec] = {codec.VERSION: codec for codec in (MsgpackCodec(), JsonCodec())}
+
+DEFAULT_CODEC: Codec = CODECS[MsgpackCodec.VERSION] if msgpack is not None else CODECS[JsonCodec.VERSION]
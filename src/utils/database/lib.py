@@ -3,15 +3,23 @@
 原作者：@Snowykami
 本文件按原始仓库：LiteyukiStudio/LiteyukiBot
 """
-from typing import Any, Callable, TypeVar
+from typing import Any, Callable, ClassVar, Iterable, Iterator, TypeVar
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import namedtuple
+from functools import lru_cache, partial, wraps
 from packaging.version import parse
 from pydantic import BaseModel
 
 import os
 import pickle
+import asyncio
 import sqlite3
 import inspect
 import pydantic
+import threading
+
+from .codec import CODECS, DEFAULT_CODEC, FOREIGN_FLAG, LEGACY_HEADER, Codec
 
 T = TypeVar("T")
 
@@ -21,6 +29,22 @@ class LiteModel(BaseModel):
     TABLE_NAME: str | None = None
     id: int | None = None
 
+    # 二级索引，每项为一组字段名，由 auto_migrate 创建
+    INDEXES: ClassVar[tuple[tuple[str, ...], ...]] = ()
+    # 唯一索引，写入重复值时 INSERT OR REPLACE 会替换原有行
+    UNIQUE_INDEXES: ClassVar[tuple[tuple[str, ...], ...]] = ()
+
+    @classmethod
+    def merge(cls, rows: list["LiteModel"]) -> "LiteModel":
+        """合并唯一索引字段重复的行，auto_migrate 创建唯一索引前调用
+        Args:
+            rows: 重复的行，按 id 升序
+
+        Returns:
+            合并后的数据模型，写入 id 最小的一行，默认直接保留该行
+        """
+        return rows[0]
+
     def dump(self, *args, **kwargs):
         
         if parse(pydantic.__version__) < parse("2.0.0"):
@@ -29,18 +53,165 @@ class LiteModel(BaseModel):
             return self.model_dump(*args, **kwargs)
 
 
+def locked(func):
+    """
+    在主连接上执行时持有数据库锁，读连接线程中直接执行
+    """
+    @wraps(func)
+    def wrapper(self: "Database", *args, **kwargs):
+        with self._guard():
+            return func(self, *args, **kwargs)
+    return wrapper
+
+
+@lru_cache(maxsize=None)
+def get_row_type(model_name: str, columns: tuple[str, ...]) -> type:
+    """
+    获取`select`结果使用的具名元组类型
+    """
+    return namedtuple(f"{model_name}Row", columns)
+
+
 class Database:
-    def __init__(self, db_name: str):
+    def __init__(self, db_name: str, readers: int = 4, codec: Codec | None = None):
+        """
+        Args:
+            db_name: 数据库文件路径
+            readers: 异步查询使用的只读连接数量
+            codec: 列表、字典等字段的编码器，默认使用 msgpack
+        """
 
         if os.path.dirname(db_name) != "" and not os.path.exists(os.path.dirname(db_name)):
             os.makedirs(os.path.dirname(db_name))
 
         self.db_name = db_name
-        self.conn = sqlite3.connect(db_name)
-        self.cursor = self.conn.cursor()
+        self.codec = codec or DEFAULT_CODEC
+        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        self._configure(self.conn)
+        self._cursor = self.conn.cursor()
+
+        # 同步方法与写线程共用主连接，由锁串行化；读连接各自独立，在 WAL 模式下不会被写入阻塞
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._readers = readers
+        self._reader_conns: list[sqlite3.Connection] = []
+        self._writer: ThreadPoolExecutor | None = None
+        self._tables: set[str] | None = None
+        self._columns: dict[str, list[str]] = {}
+        self._transaction_depth = 0
+        self._reader: ThreadPoolExecutor | None = None
 
         self._on_save_callbacks = []
 
+    @property
+    def cursor(self) -> sqlite3.Cursor:
+        """当前线程使用的游标，读连接线程中为只读连接的游标"""
+        return getattr(self._local, "cursor", None) or self._cursor
+
+    def _is_reader(self) -> bool:
+        return getattr(self._local, "cursor", None) is not None
+
+    def _configure(self, conn: sqlite3.Connection) -> None:
+        if self.db_name == ":memory:":
+            return
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = {self.CACHE_SIZE}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+
+    def _init_reader(self) -> None:
+        conn = sqlite3.connect(self.db_name, check_same_thread=False)
+        self._configure(conn)
+        conn.execute("PRAGMA query_only = ON")
+        self._reader_conns.append(conn)
+        self._local.cursor = conn.cursor()
+
+    def submit(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+        """在写线程中执行，写线程只有一个，提交的操作按顺序执行
+        Args:
+            func: 可调用对象，通常为本实例的同步方法
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            Future
+        """
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{os.path.basename(self.db_name)}-writer")
+        return self._writer.submit(func, *args, **kwargs)
+
+    async def _run_writer(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    async def _run_reader(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self.db_name == ":memory:" or self._readers <= 0:
+            # 内存数据库无法被其他连接访问
+            return await self._run_writer(func, *args, **kwargs)
+        if self._reader is None:
+            self._reader = ThreadPoolExecutor(
+                max_workers=self._readers,
+                thread_name_prefix=f"{os.path.basename(self.db_name)}-reader",
+                initializer=self._init_reader
+            )
+        return await asyncio.get_running_loop().run_in_executor(self._reader, partial(func, *args, **kwargs))
+
+    async def a_where_one(self, model: LiteModel, condition: str = "", *args: Any, default: T = None) -> LiteModel | T | None:
+        """异步查询第一个，参数同`where_one`"""
+        return await self._run_reader(self.where_one, model, condition, *args, default=default)
+
+    async def a_where_all(self, model: LiteModel, condition: str = "", *args: Any, default: T = None) -> list[LiteModel | T] | T | None:
+        """异步查询所有，参数同`where_all`"""
+        return await self._run_reader(self.where_all, model, condition, *args, default=default)
+
+    async def a_count(self, model: LiteModel, condition: str = "", *args: Any) -> int:
+        """异步统计满足条件的行数，参数同`count`"""
+        return await self._run_reader(self.count, model, condition, *args)
+
+    async def a_exists(self, model: LiteModel, condition: str = "", *args: Any) -> bool:
+        """异步判断是否存在满足条件的行，参数同`exists`"""
+        return await self._run_reader(self.exists, model, condition, *args)
+
+    async def a_select(self, model: LiteModel, columns: list[str], condition: str = "", *args: Any) -> list[tuple]:
+        """异步查询部分字段，参数同`select`"""
+        return await self._run_reader(self.select, model, columns, condition, *args)
+
+    async def a_read(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """在读连接线程中执行，适合在其中使用`iter_where`等逐批读取的查询
+        Args:
+            func: 可调用对象
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            func 的返回值
+        """
+        return await self._run_reader(func, *args, **kwargs)
+
+    async def a_save(self, *args: LiteModel) -> None:
+        """异步增/改操作，在写线程中执行，参数同`save`"""
+        return await self._run_writer(self.save, *args)
+
+    async def a_save_many(self, models: Iterable[LiteModel]) -> None:
+        """异步批量增/改操作，在写线程中执行，参数同`save_many`"""
+        return await self._run_writer(self.save_many, list(models))
+
+    async def a_delete(self, model: LiteModel, condition: str, *args: Any, allow_empty: bool = False) -> None:
+        """异步删除满足条件的数据，在写线程中执行，参数同`delete`"""
+        return await self._run_writer(self.delete, model, condition, *args, allow_empty=allow_empty)
+
+    def close(self) -> None:
+        """等待写线程中的操作完成并关闭所有连接"""
+        for executor in (self._writer, self._reader):
+            if executor is not None:
+                executor.shutdown(wait=True)
+        self._writer = self._reader = None
+        for conn in self._reader_conns:
+            conn.close()
+        self._reader_conns.clear()
+        with self._lock:
+            self.conn.close()
+
+    @locked
     def where_one(self, model: LiteModel, condition: str = "", *args: Any, default: T = None) -> LiteModel | T | None:
         """查询第一个
         Args:
@@ -52,9 +223,10 @@ class Database:
         Returns:
 
         """
-        all_results = self.where_all(model, condition, *args)
-        return all_results[0] if all_results else default
+        results = self._query(model, condition, args, " LIMIT 1")
+        return results[0] if results else default
 
+    @locked
     def where_all(self, model: LiteModel, condition: str = "", *args: Any, default: T = None) -> list[LiteModel | T] | T | None:
         """查询所有
         Args:
@@ -66,132 +238,352 @@ class Database:
         Returns:
 
         """
-        table_name = model.TABLE_NAME
+        results = self._query(model, condition, args)
+        return results or default
+
+    def iter_where(self, model: LiteModel, condition: str = "", *args: Any, batch_size: int = 100) -> Iterator[LiteModel]:
+        """逐批查询，每次只读取并构造`batch_size`个数据模型
+        Args:
+            model: 数据模型实例
+            condition: 查询条件，不给定则查询所有
+            *args: 参数化查询参数
+            batch_size: 每批读取的行数
+
+        Returns:
+            数据模型生成器
+        """
         model_type = type(model)
+        with self._guard():
+            cursor = self.cursor.connection.cursor()
+            cursor.execute(self._get_select_sql(model, condition), args)
+            fields = [description[0] for description in cursor.description]
+        try:
+            while True:
+                with self._guard():
+                    results = cursor.fetchmany(batch_size)
+                    batch = [model_type(**row) for row in self._load_rows([dict(zip(fields, result)) for result in results])]
+                if not batch:
+                    return
+                yield from batch
+        finally:
+            cursor.close()
+
+    @locked
+    def count(self, model: LiteModel, condition: str = "", *args: Any) -> int:
+        """统计满足条件的行数
+        Args:
+            model: 数据模型实例
+            condition: 查询条件，不给定则统计整个表
+            *args: 参数化查询参数
+
+        Returns:
+            行数
+        """
+        return self.cursor.execute(self._get_select_sql(model, condition, "COUNT(*)"), args).fetchone()[0]
+
+    @locked
+    def exists(self, model: LiteModel, condition: str = "", *args: Any) -> bool:
+        """是否存在满足条件的行
+        Args:
+            model: 数据模型实例
+            condition: 查询条件，不给定则判断表是否为空
+            *args: 参数化查询参数
+
+        Returns:
+            是否存在
+        """
+        return self.cursor.execute(self._get_select_sql(model, condition, "1") + " LIMIT 1", args).fetchone() is not None
+
+    @locked
+    def select(self, model: LiteModel, columns: list[str], condition: str = "", *args: Any) -> list[tuple]:
+        """只查询部分字段，不构造数据模型，只解码所查询的字段
+        Args:
+            model: 数据模型实例
+            columns: 字段名
+            condition: 查询条件，不给定则查询所有
+            *args: 参数化查询参数
+
+        Returns:
+            以字段名为属性的具名元组列表，嵌套的数据模型保持为字典
+        """
+        stored_columns = []
+        for column in columns:
+            if column == "id":
+                stored_columns.append(column)
+            elif column in model.__dict__ and column != "TABLE_NAME":
+                stored_columns.append(self._get_stored_field_prefix(getattr(model, column)) + column)
+            else:
+                raise ValueError(f"数据模型{type(model).__name__}不存在字段 {column}")
+        row_type = get_row_type(type(model).__name__, tuple(columns))
+        sql = self._get_select_sql(model, condition, ", ".join(f'"{column}"' for column in stored_columns))
+        results = self.cursor.execute(sql, args).fetchall()
+        return [
+            row_type(*[row.get(column, getattr(model, column)) for column in columns])
+            for row in self._load_rows([dict(zip(stored_columns, result)) for result in results])
+        ]
+
+    def _guard(self):
+        return nullcontext() if self._is_reader() else self._lock
+
+    @staticmethod
+    def _get_select_sql(model: LiteModel, condition: str = "", columns: str = "*") -> str:
+        table_name = model.TABLE_NAME
         if not table_name:
-            raise ValueError(f"数据模型{model_type.__name__}未提供表名")
+            raise ValueError(f"数据模型{type(model).__name__}未提供表名")
         if condition:
-            results = self.cursor.execute(f"SELECT * FROM {table_name} WHERE {condition}", args).fetchall()
-        else:
-            results = self.cursor.execute(f"SELECT * FROM {table_name}").fetchall()
+            return f"SELECT {columns} FROM {table_name} WHERE {condition}"
+        return f"SELECT {columns} FROM {table_name}"
+
+    def _query(self, model: LiteModel, condition: str, args: tuple, suffix: str = "") -> list[LiteModel]:
+        model_type = type(model)
+        results = self.cursor.execute(self._get_select_sql(model, condition) + suffix, args).fetchall()
         fields = [description[0] for description in self.cursor.description]
-        if not results:
-            return default
-        else:
-            return [model_type(**self._load(dict(zip(fields, result)))) for result in results]
+        return [model_type(**row) for row in self._load_rows([dict(zip(fields, result)) for result in results])]
 
+    @locked
     def save(self, *args: LiteModel) -> None:
-        """增/改操作
+        """增/改操作，所有模型在同一事务中写入，新插入的模型会被填写 id
         Args:
             *args:
         Returns:
         """
-        table_list = [item[0] for item in self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()]
-        for model in args:
-            if not model.TABLE_NAME:
-                raise ValueError(f"数据模型 {model.__class__.__name__} 未提供表名")
-            elif model.TABLE_NAME not in table_list:
-                raise ValueError(f"数据模型 {model.__class__.__name__} 表 {model.TABLE_NAME} 不存在，请先迁移")
-            else:
+        with self.transaction():
+            for model in args:
+                self._check_table(model)
                 self._save(model.dump(by_alias=True))
+                if model.id is None:
+                    # 之后再次保存同一实例时覆盖同一行
+                    model.id = self.cursor.lastrowid
 
+        for model in args:
             for callback in self._on_save_callbacks:
                 callback(model)
 
-    def _save(self, obj: Any) -> Any:
-        
-        if isinstance(obj, dict):
-            table_name = obj.get("TABLE_NAME")
-            row_id = obj.get("id")
-            new_obj = {}
-            for field, value in obj.items():
-                if isinstance(value, self.ITERABLE_TYPE):
-                    new_obj[self._get_stored_field_prefix(value) + field] = self._save(value)  
-                elif isinstance(value, self.BASIC_TYPE):
-                    new_obj[field] = value
-                else:
-                    raise ValueError(f"数据模型{table_name}包含不支持的数据类型，字段：{field} 值：{value} 值类型：{type(value)}")
-            if table_name:
-                fields, values = [], []
-                for n_field, n_value in new_obj.items():
-                    if n_field not in ["TABLE_NAME", "id"]:
-                        fields.append(n_field)
-                        values.append(n_value)
-                
-                fields = list(fields)
-                values = list(values)
-                if row_id is not None:
-                    
-                    fields.insert(0, 'id')
-                    
-                    values.insert(0, row_id)
-                fields = ', '.join([f'"{field}"' for field in fields])
-                placeholders = ', '.join('?' for _ in values)
-                self.cursor.execute(f"INSERT OR REPLACE INTO {table_name}({fields}) VALUES ({placeholders})", tuple(values))
-                self.conn.commit()
-                foreign_id = self.cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
-                return f"{self.FOREIGN_KEY_PREFIX}{foreign_id}@{table_name}"  
+    @locked
+    def save_many(self, models: Iterable[LiteModel]) -> None:
+        """批量增/改操作，按表与字段分组后使用 executemany 写入，只提交一次
+        Args:
+            models: 数据模型实例
+
+        Returns:
+        """
+        models = list(models)
+        groups: dict[tuple[str, tuple[str, ...]], list[tuple]] = {}
+        with self.transaction():
+            for model in models:
+                self._check_table(model)
+                fields, values = self._get_row(self._encode_fields(model.dump(by_alias=True)))
+                groups.setdefault((model.TABLE_NAME, fields), []).append(values) # type: ignore
+            for (table_name, fields), rows in groups.items():
+                self.cursor.executemany(self._get_insert_sql(table_name, fields), rows)
+
+        for model in models:
+            for callback in self._on_save_callbacks:
+                callback(model)
+
+    @contextmanager
+    def transaction(self) -> Iterator["Database"]:
+        """事务，期间的写入在退出时一并提交，出现异常时回滚，可以嵌套
+        Examples:
+            with db.transaction():
+                db.save(...)
+                db.delete(...)
+        """
+        with self._lock:
+            self._transaction_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self.conn.rollback()
+                raise
+            else:
+                self._transaction_depth -= 1
+                self._commit()
+
+    def _commit(self) -> None:
+        if self._transaction_depth == 0:
+            self.conn.commit()
+
+    def _get_tables(self) -> set[str]:
+        if self._tables is None:
+            self._tables = {item[0] for item in self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+        return self._tables
+
+    def _check_table(self, model: LiteModel) -> None:
+        if not model.TABLE_NAME:
+            raise ValueError(f"数据模型 {model.__class__.__name__} 未提供表名")
+        elif model.TABLE_NAME not in self._get_tables():
+            raise ValueError(f"数据模型 {model.__class__.__name__} 表 {model.TABLE_NAME} 不存在，请先迁移")
+
+    def _encode_fields(self, obj: dict) -> dict:
+        table_name = obj.get("TABLE_NAME")
+        new_obj = {}
+        for field, value in obj.items():
+            if isinstance(value, dict) and value.get("TABLE_NAME"):
+                new_obj[self.FOREIGN_KEY_PREFIX + field] = self._save(value)
+            elif isinstance(value, self.ITERABLE_TYPE):
+                new_obj[self._get_stored_field_prefix(value) + field] = self._encode(value)
+            elif isinstance(value, self.BASIC_TYPE):
+                new_obj[field] = value
             else:
-                return pickle.dumps(new_obj)  
+                raise ValueError(f"数据模型{table_name}包含不支持的数据类型，字段：{field} 值：{value} 值类型：{type(value)}")
+        return new_obj
+
+    @staticmethod
+    def _get_row(new_obj: dict) -> tuple[tuple[str, ...], tuple]:
+        fields, values = [], []
+        if new_obj.get("id") is not None:
+            fields.append("id")
+            values.append(new_obj["id"])
+        for n_field, n_value in new_obj.items():
+            if n_field not in ["TABLE_NAME", "id"]:
+                fields.append(n_field)
+                values.append(n_value)
+        return tuple(fields), tuple(values)
+
+    @staticmethod
+    def _get_insert_sql(table_name: str, fields: tuple[str, ...]) -> str:
+        columns = ', '.join([f'"{field}"' for field in fields])
+        placeholders = ', '.join('?' for _ in fields)
+        return f"INSERT OR REPLACE INTO {table_name}({columns}) VALUES ({placeholders})"
+
+    def _save(self, obj: dict) -> str:
+        table_name = obj.get("TABLE_NAME")
+        fields, values = self._get_row(self._encode_fields(obj))
+        self.cursor.execute(self._get_insert_sql(table_name, fields), values) # type: ignore
+        self._commit()
+        return f"{self.FOREIGN_KEY_PREFIX}{self.cursor.lastrowid}@{table_name}"  
+
+    def _encode(self, value: Any) -> bytes:
+        """编码列表、字典等字段，嵌套的数据模型会先储存到对应的表并替换为外键"""
+        refs: list[str] = []
+        data = self._prepare(value, refs)
+        header = self.codec.VERSION | (FOREIGN_FLAG if refs else 0)
+        return bytes((header,)) + self.codec.dumps(data)
+
+    def _prepare(self, obj: Any, refs: list[str]) -> Any:
+        if isinstance(obj, dict):
+            if obj.get("TABLE_NAME"):
+                ref = self._save(obj)
+                refs.append(ref)
+                return ref
+            return {field: self._prepare(value, refs) for field, value in obj.items()}
         elif isinstance(obj, (list, set, tuple)):
-            obj_type = type(obj)  
-            new_obj = []
-            for item in obj:
-                if isinstance(item, self.ITERABLE_TYPE):
-                    new_obj.append(self._save(item))
-                elif isinstance(item, self.BASIC_TYPE):
-                    new_obj.append(item)
-                else:
-                    raise ValueError(f"数据模型包含不支持的数据类型，值：{item} 值类型：{type(item)}")
-            return pickle.dumps(obj_type(new_obj))  
+            return [self._prepare(item, refs) for item in obj]
+        elif isinstance(obj, str) and obj.startswith(self.FOREIGN_KEY_PREFIX):
+            # 从旧版本迁移的外键
+            refs.append(obj)
+            return obj
+        elif isinstance(obj, self.BASIC_TYPE):
+            return obj
         else:
             raise ValueError(f"数据模型包含不支持的数据类型，值：{obj} 值类型：{type(obj)}")
 
-    def _load(self, obj: Any) -> Any:
+    def _decode(self, value: bytes) -> tuple[Any, bool]:
+        """解码列表、字典等字段，不包含外键时只需要一次解码调用
 
+        Returns:
+            解码后的数据，以及其中是否可能包含外键
+        """
+        header = value[0]
+        if header == LEGACY_HEADER:
+            return self._load_legacy(pickle.loads(value)), True
+        codec = CODECS.get(header & ~FOREIGN_FLAG)
+        if codec is None:
+            raise ValueError(f"未知的数据编码版本：{header:#04x}")
+        return codec.loads(memoryview(value)[1:]), bool(header & FOREIGN_FLAG)
+
+    def _load_legacy(self, obj: Any) -> Any:
+        """还原旧版本逐层 pickle 的数据，外键保持为字符串"""
         if isinstance(obj, dict):
-
             new_obj = {}
-
             for field, value in obj.items():
-
-                field: str
-
                 if field.startswith(self.BYTES_PREFIX):
                     if isinstance(value, bytes):
-                        new_obj[field.replace(self.BYTES_PREFIX, "")] = self._load(pickle.loads(value))
-                    else:  
-                        pass
-                        
-
+                        new_obj[field.replace(self.BYTES_PREFIX, "")] = self._load_legacy(pickle.loads(value))
                 elif field.startswith(self.FOREIGN_KEY_PREFIX):
-
-                    new_obj[field.replace(self.FOREIGN_KEY_PREFIX, "")] = self._load(self._get_foreign_data(value))
-
+                    new_obj[field.replace(self.FOREIGN_KEY_PREFIX, "")] = value
                 else:
                     new_obj[field] = value
             return new_obj
         elif isinstance(obj, (list, set, tuple)):
-
             new_obj = []
             for item in obj:
-
                 if isinstance(item, bytes):
-
-                    
                     try:
-                        new_obj.append(self._load(pickle.loads(item)))
+                        new_obj.append(self._load_legacy(pickle.loads(item)))
                     except Exception:
-                        new_obj.append(self._load(item))
-
-                elif isinstance(item, str) and item.startswith(self.FOREIGN_KEY_PREFIX):
-                    new_obj.append(self._load(self._get_foreign_data(item)))
+                        new_obj.append(item)
                 else:
-                    new_obj.append(self._load(item))
+                    new_obj.append(self._load_legacy(item))
             return new_obj
         else:
             return obj
 
+    def _load(self, obj: dict) -> dict:
+        return self._load_rows([obj])[0]
+
+    def _load_rows(self, rows: list[dict]) -> list[dict]:
+        """解码一批数据行，所有行中的外键按表合并查询"""
+        refs: set[str] = set()
+        pending: list[tuple[dict, str]] = []
+        new_rows = []
+        for row in rows:
+            new_obj = {}
+            for field, value in row.items():
+                if field.startswith(self.BYTES_PREFIX):
+                    if isinstance(value, bytes):
+                        field = field.replace(self.BYTES_PREFIX, "")
+                        new_obj[field], has_refs = self._decode(value)
+                        if has_refs and self._collect_refs(new_obj[field], refs):
+                            pending.append((new_obj, field))
+                elif field.startswith(self.FOREIGN_KEY_PREFIX):
+                    field = field.replace(self.FOREIGN_KEY_PREFIX, "")
+                    new_obj[field] = value
+                    if self._collect_refs(value, refs):
+                        pending.append((new_obj, field))
+                else:
+                    new_obj[field] = value
+            new_rows.append(new_obj)
+        if refs:
+            foreign_data = self._get_foreign_data(refs)
+            for new_obj, field in pending:
+                new_obj[field] = self._replace_refs(new_obj[field], foreign_data)
+        return new_rows
+
+    def _collect_refs(self, obj: Any, refs: set[str]) -> bool:
+        if isinstance(obj, str):
+            if obj.startswith(self.FOREIGN_KEY_PREFIX):
+                refs.add(obj)
+                return True
+            return False
+        elif isinstance(obj, dict):
+            return any([self._collect_refs(value, refs) for value in obj.values()])
+        elif isinstance(obj, list):
+            return any([self._collect_refs(item, refs) for item in obj])
+        return False
+
+    def _replace_refs(self, obj: Any, foreign_data: dict[str, dict]) -> Any:
+        if isinstance(obj, str):
+            return foreign_data.get(obj, obj)
+        elif isinstance(obj, dict):
+            return {field: self._replace_refs(value, foreign_data) for field, value in obj.items()}
+        elif isinstance(obj, list):
+            return [self._replace_refs(item, foreign_data) for item in obj]
+        return obj
+
+    def _migrate_legacy(self, table_name: str, columns: list[str]) -> None:
+        """将旧版本 pickle 编码的字段重新编码"""
+        for column in columns:
+            rows = self.cursor.execute(
+                f'SELECT id, "{column}" FROM "{table_name}" WHERE substr("{column}", 1, 1) = ?', (bytes((LEGACY_HEADER,)),)
+            ).fetchall()
+            updates = [(self._encode(self._load_legacy(pickle.loads(value))), row_id) for row_id, value in rows]
+            self.cursor.executemany(f'UPDATE "{table_name}" SET "{column}" = ? WHERE id = ?', updates)
+
+    @locked
     def delete(self, model: LiteModel, condition: str, *args: Any, allow_empty: bool = False) -> None:
         """
         删除满足条件的数据
@@ -212,8 +604,108 @@ class Database:
         if not condition and not allow_empty:
             raise ValueError("删除操作必须提供条件")
         self.cursor.execute(f"DELETE FROM {table_name} WHERE {condition}", args)
+        self._commit()
+
+    @locked
+    def update(self, model: LiteModel, values: dict[str, Any], condition: str = "", *args: Any) -> int:
+        """只更新给定的字段，不重写整行
+        Args:
+            model: 数据模型实例，提供 id 时按 id 更新
+            values: 字段名到新值的映射
+            condition: 更新条件
+            *args: 参数化查询参数
+
+        Returns:
+            更新的行数
+        """
+        table_name = model.TABLE_NAME
+        if not table_name:
+            raise ValueError(f"数据模型{model.__class__.__name__}未提供表名")
+        if model.id is not None:
+            condition, args = "id = ?", (model.id,)
+        if not condition:
+            raise ValueError("更新操作必须提供条件")
+        with self.transaction():
+            columns, params = [], []
+            for field, value in values.items():
+                if field in ["TABLE_NAME", "id"] or field not in model.__dict__:
+                    raise ValueError(f"数据模型{type(model).__name__}不存在字段 {field}")
+                if isinstance(value, LiteModel):
+                    value = value.dump(by_alias=True)
+                if isinstance(value, dict) and value.get("TABLE_NAME"):
+                    columns.append(self.FOREIGN_KEY_PREFIX + field)
+                    params.append(self._save(value))
+                elif isinstance(value, self.ITERABLE_TYPE):
+                    columns.append(self._get_stored_field_prefix(value) + field)
+                    params.append(self._encode(value))
+                elif isinstance(value, self.BASIC_TYPE):
+                    columns.append(field)
+                    params.append(value)
+                else:
+                    raise ValueError(f"数据模型{table_name}包含不支持的数据类型，字段：{field} 值：{value} 值类型：{type(value)}")
+            if not columns:
+                return 0
+            assignments = ", ".join(f'"{column}" = ?' for column in columns)
+            self.cursor.execute(f'UPDATE "{table_name}" SET {assignments} WHERE {condition}', (*params, *args))
+            return self.cursor.rowcount
+
+    def delete_batched(self, model: LiteModel, condition: str, *args: Any, batch_size: int = 500) -> int:
+        """分批删除满足条件的数据，每批单独提交，期间不会长时间占用数据库
+        Args:
+            model: 数据模型实例
+            condition: 删除条件
+            *args: 参数化查询参数
+            batch_size: 每批删除的行数
+
+        Returns:
+            删除的行数
+        """
+        table_name = model.TABLE_NAME
+        if not table_name:
+            raise ValueError(f"数据模型{model.__class__.__name__}未提供表名")
+        if not condition:
+            raise ValueError("删除操作必须提供条件")
+        total = 0
+        while True:
+            with self.transaction():
+                self.cursor.execute(
+                    f'DELETE FROM "{table_name}" WHERE id IN (SELECT id FROM "{table_name}" WHERE {condition} LIMIT {int(batch_size)})', args
+                )
+                deleted = self.cursor.rowcount
+            total += deleted
+            if deleted < batch_size:
+                return total
+
+    @locked
+    def vacuum(self) -> int:
+        """回收空闲页并更新查询优化器的统计信息
+        首次执行时将数据库转换为增量回收模式，需要完整重建一次
+
+        Returns:
+            回收的字节数
+        """
+        if self.db_name == ":memory:":
+            return 0
+        before = self._get_file_size()
         self.conn.commit()
+        if self.cursor.execute("PRAGMA auto_vacuum").fetchone()[0] != self.INCREMENTAL_VACUUM:
+            self.cursor.execute(f"PRAGMA auto_vacuum = {self.INCREMENTAL_VACUUM}")
+            self.cursor.execute("VACUUM")
+        else:
+            self.cursor.execute("PRAGMA incremental_vacuum").fetchall()
+        self.cursor.execute("PRAGMA optimize")
+        self.conn.commit()
+        self.cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        return max(0, before - self._get_file_size())
+
+    def _get_file_size(self) -> int:
+        return sum(
+            os.path.getsize(path)
+            for path in (self.db_name, self.db_name + "-wal")
+            if os.path.exists(path)
+        )
 
+    @locked
     def auto_migrate(self, *args: LiteModel) -> None:
 
         """
@@ -224,6 +716,7 @@ class Database:
         Returns:
 
         """
+        schema_version = self.cursor.execute("PRAGMA user_version").fetchone()[0]
         for model in args:
             if not model.TABLE_NAME:
                 raise ValueError(f"数据模型{type(model).__name__}未提供表名")
@@ -249,13 +742,85 @@ class Database:
                         f"ALTER TABLE '{model.TABLE_NAME}' ADD COLUMN {n_field} {n_type} DEFAULT {self.DEFAULT_MAPPING.get(n_type, default_value)}"
                     )
 
+            # 先删除不再声明的索引，被索引的字段无法删除
+            new_indexes = self._get_indexes(model, new_structure)
+            existing_indexes = [item[0] for item in self.cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (model.TABLE_NAME,)
+            ).fetchall()]
+            for e_index in existing_indexes:
+                if e_index.startswith(self.INDEX_PREFIXES) and e_index not in new_indexes:
+                    self.cursor.execute(f'DROP INDEX IF EXISTS "{e_index}"')
+
             
             for e_field in existing_structure.keys():
                 if e_field not in new_structure.keys() and e_field.lower() not in ['id']:
                     self.cursor.execute(
                         f'ALTER TABLE "{model.TABLE_NAME}" DROP COLUMN "{e_field}"'
                     )
-        self.conn.commit()
+
+            for fields in model.UNIQUE_INDEXES:
+                if f"{self.INDEX_PREFIXES[1]}{model.TABLE_NAME}_{'_'.join(fields)}" not in existing_indexes:
+                    self._remove_duplicates(model, fields)
+
+            for n_index, n_sql in new_indexes.items():
+                if n_index not in existing_indexes:
+                    self.cursor.execute(n_sql)
+
+            if schema_version < self.SCHEMA_VERSION:
+                self._migrate_legacy(model.TABLE_NAME, [field for field in new_structure if field.startswith(self.BYTES_PREFIX)])
+        self._tables = None
+        self._columns.clear()
+        if schema_version < self.SCHEMA_VERSION:
+            self.cursor.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self._commit()
+
+    def _remove_duplicates(self, model: LiteModel, fields: tuple[str, ...]) -> None:
+        """合并唯一索引字段重复的行，合并结果写入 id 最小的一行，即 where_one 读到的行，其余的行删除
+        Args:
+            model: 数据模型实例，合并方式见 LiteModel.merge
+            fields: 唯一索引的字段
+        """
+        table_name = model.TABLE_NAME
+        columns = ", ".join(f'"{field}"' for field in fields)
+        if type(model).merge.__func__ is not LiteModel.merge.__func__: # type: ignore
+            # 表结构刚刚迁移，按新的结构读取
+            self._tables = None
+            self._columns.clear()
+            duplicates = self.cursor.execute(
+                f'SELECT {columns} FROM "{table_name}" GROUP BY {columns} HAVING COUNT(*) > 1'
+            ).fetchall()
+            condition = " AND ".join(f'"{field}" IS ?' for field in fields)
+            for values in duplicates:
+                rows = self.where_all(model, condition + " ORDER BY id", *values, default=[])
+                merged = type(model).merge(rows)
+                merged.id = rows[0].id
+                self.save(merged)
+        self.cursor.execute(
+            f'DELETE FROM "{table_name}" WHERE id NOT IN (SELECT MIN(id) FROM "{table_name}" GROUP BY {columns})'
+        )
+
+    def _get_indexes(self, model: LiteModel, structure: dict[str, str]) -> dict[str, str]:
+        """获取模型声明的索引
+        Args:
+            model: 数据模型实例
+            structure: 迁移后的表结构
+
+        Returns:
+            索引名到建索引语句的映射
+        """
+        indexes = {}
+        for prefix, unique, declared in (
+            (self.INDEX_PREFIXES[0], "", model.INDEXES),
+            (self.INDEX_PREFIXES[1], "UNIQUE ", model.UNIQUE_INDEXES)
+        ):
+            for fields in declared:
+                for field in fields:
+                    if field not in structure:
+                        raise ValueError(f"数据模型{type(model).__name__}的索引字段 {field} 不存在或不是基本类型")
+                name = f"{prefix}{model.TABLE_NAME}_{'_'.join(fields)}"
+                columns = ", ".join(f'"{field}"' for field in fields)
+                indexes[name] = f'CREATE {unique}INDEX IF NOT EXISTS "{name}" ON "{model.TABLE_NAME}" ({columns})'
+        return indexes
         
 
     def _get_stored_field_prefix(self, value) -> str:
@@ -288,21 +853,38 @@ class Database:
             return "INTEGER"
         return self.TYPE_MAPPING.get(type(value), "TEXT")
 
-    def _get_foreign_data(self, foreign_value: str) -> dict:
+    def _get_foreign_data(self, refs: Iterable[str]) -> dict[str, dict]:
         """
-        获取外键数据
+        获取外键数据，同一个表的外键合并为一次查询
         Args:
-            foreign_value:
+            refs: 外键
 
         Returns:
-
+            外键到已解码数据的映射
         """
-        foreign_value = foreign_value.replace(self.FOREIGN_KEY_PREFIX, "")
-        table_name = foreign_value.split("@")[-1]
-        foreign_id = foreign_value.split("@")[0]
-        fields = [description[1] for description in self.cursor.execute(f"PRAGMA table_info({table_name})").fetchall()]
-        result = self.cursor.execute(f"SELECT * FROM {table_name} WHERE id = ?", (foreign_id,)).fetchone()
-        return dict(zip(fields, result))
+        ids: dict[str, list[int]] = {}
+        for ref in refs:
+            foreign_id, _, table_name = ref.replace(self.FOREIGN_KEY_PREFIX, "", 1).partition("@")
+            ids.setdefault(table_name, []).append(int(foreign_id))
+        foreign_data = {}
+        for table_name, table_ids in ids.items():
+            fields = self._get_columns(table_name)
+            columns = ", ".join(f'"{field}"' for field in fields)
+            results = []
+            for i in range(0, len(table_ids), self.MAX_VARIABLES):
+                chunk = table_ids[i:i + self.MAX_VARIABLES]
+                placeholders = ", ".join("?" for _ in chunk)
+                results += self.cursor.execute(f'SELECT {columns} FROM "{table_name}" WHERE id IN ({placeholders})', chunk).fetchall()
+            for row in self._load_rows([dict(zip(fields, result)) for result in results]):
+                foreign_data[f"{self.FOREIGN_KEY_PREFIX}{row['id']}@{table_name}"] = row
+        return foreign_data
+
+    def _get_columns(self, table_name: str) -> list[str]:
+        """获取表的字段名，结果会被缓存，迁移后失效"""
+        columns = self._columns.get(table_name)
+        if columns is None:
+            columns = self._columns[table_name] = [column[1] for column in self.cursor.execute(f'PRAGMA table_info("{table_name}")').fetchall()]
+        return columns
 
     def on_save(self, func: Callable[[LiteModel, Any], None]):
         """
@@ -359,4 +941,19 @@ class Database:
     
     FOREIGN_KEY_PREFIX = "FOREIGN_KEY_"
     
-    BYTES_PREFIX = "PICKLE_BYTES_"
\ No newline at end of file
+    BYTES_PREFIX = "PICKLE_BYTES_"
+
+    # 由 auto_migrate 管理的普通索引与唯一索引名前缀
+    INDEX_PREFIXES = ("idx_", "uidx_")
+
+    # 数据库结构版本，记录在 PRAGMA user_version 中，1 起不再使用 pickle 编码
+    SCHEMA_VERSION = 1
+
+    # 单条语句中参数数量的上限，低于旧版本 SQLite 的默认限制 999
+    MAX_VARIABLES = 900
+
+    # PRAGMA auto_vacuum 的增量回收模式
+    INCREMENTAL_VACUUM = 2
+
+    # 页缓存大小，负数表示以 KiB 为单位
+    CACHE_SIZE = -16000
\ No newline at end of file
@@ -0,0 +1,70 @@
+from src.config import Config
+from src.utils.database import cache_db
+from src.utils.database.buffer import group_message_buffer
+from src.utils.database.classes import GroupMessage, JX3APIWSData, RequestData
+from src.utils.time import Time
+
+import asyncio
+
+def trim_group_messages(before: int, batch_size: int = 200) -> int:
+    """
+    删除早于`before`的群聊发言记录，没有剩余记录的成员整行删除。
+
+    每批的读取与写回在同一事务中完成，期间不会有其他写入插入。
+
+    Args:
+        before (int): 截止时间戳。
+        batch_size (int): 每批处理的行数。
+
+    Returns:
+        removed (int): 删除的发言记录条数。
+    """
+    removed = 0
+    last_id = 0
+    while True:
+        with cache_db.transaction():
+            rows: list[GroupMessage] = cache_db.where_all(GroupMessage(), "id > ? ORDER BY id LIMIT ?", last_id, batch_size, default=[]) # type: ignore
+            if not rows:
+                return removed
+            last_id = rows[-1].id or last_id
+            changed = []
+            for row in rows:
+                messages = [m for m in row.messages if m.timestamp >= before]
+                if len(messages) == len(row.messages):
+                    continue
+                removed += len(row.messages) - len(messages)
+                if messages:
+                    row.messages = messages
+                    changed.append(row)
+                else:
+                    cache_db.delete(row, "")
+            if changed:
+                cache_db.save_many(changed)
+
+def run_maintenance() -> dict[str, int]:
+    """
+    按配置文件的`database.retention`清理`cache_db`，随后回收空闲空间。
+
+    需要在`cache_db`的写线程中执行，见`maintain_cache_db`。
+
+    Returns:
+        report (dict[str, int]): 各表删除的条数，以及回收的字节数`reclaimed`。
+    """
+    retention = Config.database.retention
+    now = Time().raw_time
+    report = {
+        "request_data": cache_db.delete_batched(RequestData(), "timestamp < ?", now - retention.request_data),
+        "jx3api_wsdata": cache_db.delete_batched(JX3APIWSData(), "timestamp < ?", now - retention.jx3api_wsdata),
+        "group_message": trim_group_messages(now - retention.group_message)
+    }
+    report["reclaimed"] = cache_db.vacuum()
+    return report
+
+async def maintain_cache_db() -> dict[str, int]:
+    """
+    在`cache_db`的写线程中执行维护，不阻塞事件循环。
+    """
+    # 先让缓冲丢弃将要清理的发言，清理期间读取的旧记录写回时也不会恢复它们
+    group_message_buffer.prune(Time().raw_time - Config.database.retention.group_message)
+    await group_message_buffer.a_flush()
+    return await asyncio.wrap_future(cache_db.submit(run_maintenance))
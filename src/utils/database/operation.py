@@ -1,8 +1,14 @@
 from typing import Any, Literal, overload
 from nonebot import get_bots
+from nonebot.log import logger
 
 from src.utils.database.classes import GroupSettings
 from src.utils.database import db
+from src.utils.network.limiter import BACKGROUND
+from src.utils.membership import group_registry
+from src.utils.outbound import outbound_queue
+
+import asyncio
 
 @overload
 def get_group_settings(group_id: int | str, key: Literal["subscribe"]) -> list[str]: ...
@@ -25,58 +31,173 @@ def get_group_settings(group_id: int | str, key: Literal["blacklist"]) -> list[d
 @overload
 def get_group_settings(group_id: int | str, key: Literal["wiki"]) -> dict: ...
 
+_group_settings: dict[str, GroupSettings] = {}
+"""
+已解码的`GroupSettings`，以`group_id`为键，所有写入都需要经过本模块或调用`invalidate_group_settings`。
+"""
+
+_subscriptions: dict[str, dict[str, set[str]]] | None = None
+"""
+订阅的倒排索引：订阅名 -> 绑定的服务器 -> 群号，首次使用时从数据库构建，随群聊设置的写入更新。
+"""
+
+_indexed: dict[str, tuple[str, tuple[str, ...]]] = {}
+"""
+各群聊在`_subscriptions`中的位置：群号 -> (服务器, 订阅名)。
+"""
+
+def _subscription_index() -> dict[str, dict[str, set[str]]]:
+    global _subscriptions
+    if _subscriptions is None:
+        _subscriptions = {}
+        _indexed.clear()
+        # 与`where_one`一致，同一群号有多行时以 id 最小的一行为准
+        for group_id, subscribe, server in db.select(GroupSettings(), ["group_id", "subscribe", "server"], "1 ORDER BY id"):
+            if group_id not in _indexed:
+                _index_group(group_id, subscribe, server)
+    return _subscriptions
+
+def _index_group(group_id: str, subscribe: list[str], server: str) -> None:
+    if _subscriptions is None:
+        return
+    _unindex_group(group_id)
+    topics = tuple(set(subscribe))
+    for topic in topics:
+        _subscriptions.setdefault(topic, {}).setdefault(server, set()).add(group_id)
+    _indexed[group_id] = (server, topics)
+
+def _unindex_group(group_id: str) -> None:
+    if _subscriptions is None or group_id not in _indexed:
+        return
+    server, topics = _indexed.pop(group_id)
+    for topic in topics:
+        servers = _subscriptions[topic]
+        servers[server].discard(group_id)
+        if not servers[server]:
+            del servers[server]
+        if not servers:
+            del _subscriptions[topic]
+
+def _cache_group_settings(group_data: GroupSettings) -> None:
+    _group_settings[group_data.group_id] = group_data
+    _index_group(group_data.group_id, group_data.subscribe, group_data.server)
+
+def _load_group_settings(group_id: str) -> GroupSettings | None:
+    group_data = _group_settings.get(group_id)
+    if group_data is None:
+        group_data = db.where_one(GroupSettings(), "group_id = ?", group_id, default=None)
+        if group_data is not None:
+            _group_settings[group_id] = group_data
+    return group_data
+
+def invalidate_group_settings(group_id: int | str | None = None) -> None:
+    """
+    使缓存的群聊设置失效，下次读取时重新查询数据库。
+
+    Args:
+        group_id (int, str, None): 群号，为`None`时清空全部缓存。
+    """
+    global _subscriptions
+    if group_id is None:
+        _group_settings.clear()
+        _subscriptions = None
+        return
+    _group_settings.pop(str(group_id), None)
+    if _subscriptions is not None:
+        group_data = _load_group_settings(str(group_id))
+        if group_data is None:
+            _unindex_group(str(group_id))
+        else:
+            _index_group(group_data.group_id, group_data.subscribe, group_data.server)
+
 def get_group_settings(group_id: int | str, key: str = "") -> Any:
-    group_data: GroupSettings | Any = db.where_one(GroupSettings(), "group_id = ?", str(group_id), default=None)
-    if group_data is not None:
-        return group_data.dump().get(key) if key else group_data.dump()
-    else:
-        db.save(GroupSettings(group_id=str(group_id)))
-        return getattr(GroupSettings(), key)
+    group_data = _load_group_settings(str(group_id))
+    if group_data is None:
+        group_data = GroupSettings(group_id=str(group_id))
+        db.save(group_data)
+        _cache_group_settings(group_data)
+    # 返回副本，调用方修改返回值不会影响缓存
+    return group_data.dump(include={key}).get(key) if key else group_data.dump()
 
 def set_group_settings(group_id: int | str, key: str, content: Any) -> None:
-    group_data: GroupSettings | Any = db.where_one(GroupSettings(), "group_id = ?", str(group_id), default=None)
+    if key not in GroupSettings.model_fields or key in ["TABLE_NAME", "id"]:
+        raise KeyError("Unknown key of class `group_data`.")
+    update_group_settings(group_id, **{key: content})
+
+def update_group_settings(group_id: int | str, **fields: Any) -> None:
+    """
+    只更新给定的群聊设置字段，以一条`UPDATE`语句写入，期间其他读取者始终能读到完整的行。
+
+    Args:
+        group_id (int, str): 群号。
+        **fields (Any): 需要更新的字段及其新值。
+    """
+    group_data = _load_group_settings(str(group_id))
+    current = group_data.dump() if group_data is not None else {"group_id": str(group_id)}
+    new_data = GroupSettings.model_validate({**current, **fields})
     if group_data is None:
-        group_data = GroupSettings(group_id=str(group_id))
+        db.save(new_data)
     else:
-        db.delete(GroupSettings(), "group_id = ?", group_id, allow_empty=False)
-    if key not in group_data.__dict__:
-        raise KeyError("Unknown key of class `group_data`.")
-    setattr(group_data, key, content)
-    db.save(group_data)
-
-def get_groups() -> bool | list:
-    all_db_obj: list[GroupSettings | Any] | None = db.where_all(GroupSettings()) or []
-    groups = []
-    if not isinstance(all_db_obj, list):
-        return False
-    for group_settings in all_db_obj:
-        groups.append(group_settings.group_id)
-    return groups
+        db.update(GroupSettings(), {field: getattr(new_data, field) for field in fields}, "group_id = ?", str(group_id))
+    _cache_group_settings(new_data)
+
+def reset_group_settings(group_id: int | str) -> None:
+    """
+    将群聊设置恢复为默认值，保留原有的行。
+
+    Args:
+        group_id (int, str): 群号。
+    """
+    group_data = _load_group_settings(str(group_id))
+    new_data = GroupSettings(id=group_data.id if group_data is not None else None, group_id=str(group_id))
+    db.save(new_data)
+    _cache_group_settings(new_data)
+
+def get_groups() -> list[str]:
+    return [row.group_id for row in db.select(GroupSettings(), ["group_id"])]
+
+def get_subscribers(subscribe: str, server: str | None = "") -> list[str]:
+    """
+    查询订阅了某项推送的群聊。
+
+    Args:
+        subscribe (str): 订阅名。
+        server (str, None): 推送所属的服务器，为空字符串时不限服务器，否则只返回绑定了该服务器的群聊。
+
+    Returns:
+        group_ids (list[str]): 群号。
+    """
+    servers = _subscription_index().get(subscribe, {})
+    if server == "":
+        return [group_id for group_ids in servers.values() for group_id in group_ids]
+    return list(servers.get(server, ())) # type: ignore
 
 async def send_subscribe(subscribe: str = "", msg: str = "", server: str | None = "") -> None:
+    """
+    向订阅了`subscribe`的群聊推送消息，经由`outbound_queue`以后台优先级并发发送。
+
+    Args:
+        subscribe (str): 订阅名。
+        msg (str): 推送的消息。
+        server (str, None): 推送所属的服务器，为空字符串时推送给所有订阅的群聊。
+    """
     bots: dict = get_bots()
     if bots == {}:
         return
-    groups = get_groups()
-    if isinstance(groups, bool):
+    group_ids = get_subscribers(subscribe, server)
+    if not group_ids:
         return
-    group: dict[str, list[str]] = {}
-
-    for i in list(bots):
-        single_groups = await bots[i].call_api("get_group_list")
-        group_id_s = []
-        for x in single_groups:
-            group_id_s.append(x["group_id"])
-        group[i] = group_id_s
-    
-    for group_id in groups:
-        for x in list(group):
-            if int(group_id) in group[x]:
-                group_data = get_group_settings(str(group_id), "subscribe")
-                if not isinstance(group_data, list):
-                    return
-                if subscribe in group_data:
-                    group_server = get_group_settings(str(group_id), "server")
-                    if server != "" and (group_server == "" or group_server != server):
-                        continue
-                    await bots[x].call_api("send_group_msg", group_id=int(group_id), message=msg)
\ No newline at end of file
+
+    await asyncio.gather(*[group_registry.ensure(bot) for bot in bots.values()])
+    results = await outbound_queue.send_many(
+        [
+            (bots[bot_id], int(group_id), msg)
+            for group_id in group_ids
+            for bot_id in group_registry.owners(int(group_id))
+            if bot_id in bots
+        ],
+        BACKGROUND
+    )
+    failed = [result for result in results if isinstance(result, Exception)]
+    if failed:
+        logger.warning(f"订阅推送 {subscribe} 共 {len(results)} 条，失败 {len(failed)} 条：{failed[0]!r}")
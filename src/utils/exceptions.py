@@ -30,4 +30,12 @@ class ConfigurationException(Exception):
     配置文件有问题。
 
     例如启用`JX3API`但没有给出`Token`。
-    """
\ No newline at end of file
+    """
+
+class CircuitBreakerOpen(ConnectTimeout):
+    """
+    上游主机连续请求失败，熔断器已断开，请求被直接拒绝。
+
+    继承自`ConnectTimeout`，以便沿用现有的超时处理。
+    """
+    ...
@@ -0,0 +1,105 @@
+from nonebot import get_bots, get_driver
+from nonebot.log import logger
+from nonebot.adapters import Bot
+
+from src.utils.nonebot_plugins import scheduler
+
+import asyncio
+
+class GroupRegistry:
+    """
+    各机器人账号所在群聊的缓存。
+
+    机器人连接时通过`get_group_list`完整获取，之后由入群、退群通知增量更新，
+    并定时完整刷新，纠正遗漏的通知。
+    """
+    def __init__(self):
+        self._groups: dict[str, set[int]] = {}
+        self._owners: dict[int, set[str]] = {}
+
+    def groups(self, bot_id: str) -> set[int]:
+        """
+        获取机器人账号所在的群聊。
+
+        Args:
+            bot_id (str): 机器人账号。
+
+        Returns:
+            group_ids (set[int]): 群号，不应修改。
+        """
+        return self._groups.get(bot_id, set())
+
+    def owners(self, group_id: int) -> set[str]:
+        """
+        获取所在群聊包含该群的机器人账号。
+
+        Args:
+            group_id (int): 群号。
+
+        Returns:
+            bot_ids (set[str]): 机器人账号，不应修改。
+        """
+        return self._owners.get(group_id, set())
+
+    def add(self, bot_id: str, group_id: int) -> None:
+        self._groups.setdefault(bot_id, set()).add(group_id)
+        self._owners.setdefault(group_id, set()).add(bot_id)
+
+    def remove(self, bot_id: str, group_id: int) -> None:
+        self._groups.get(bot_id, set()).discard(group_id)
+        owners = self._owners.get(group_id)
+        if owners is not None:
+            owners.discard(bot_id)
+            if not owners:
+                del self._owners[group_id]
+
+    def forget(self, bot_id: str) -> None:
+        """
+        移除机器人账号的全部记录，用于断开连接时。
+        """
+        for group_id in list(self._groups.get(bot_id, ())):
+            self.remove(bot_id, group_id)
+        self._groups.pop(bot_id, None)
+
+    async def refresh(self, bot: Bot) -> None:
+        """
+        通过`get_group_list`完整刷新机器人账号所在的群聊，失败时保留原有记录。
+        """
+        try:
+            group_list = await bot.call_api("get_group_list")
+        except Exception as e:
+            logger.warning(f"获取 {bot.self_id} 的群聊列表失败：{e!r}")
+            return
+        group_ids = {int(group["group_id"]) for group in group_list}
+        current = self.groups(bot.self_id)
+        for group_id in current - group_ids:
+            self.remove(bot.self_id, group_id)
+        for group_id in group_ids - current:
+            self.add(bot.self_id, group_id)
+        self._groups.setdefault(bot.self_id, set())
+
+    async def ensure(self, bot: Bot) -> None:
+        """
+        机器人账号尚未获取过群聊列表时获取一次。
+        """
+        if bot.self_id not in self._groups:
+            await self.refresh(bot)
+
+    async def refresh_all(self) -> None:
+        await asyncio.gather(*[self.refresh(bot) for bot in get_bots().values()])
+
+group_registry = GroupRegistry()
+
+driver = get_driver()
+
+@driver.on_bot_connect
+async def load_bot_groups(bot: Bot):
+    await group_registry.refresh(bot)
+
+@driver.on_bot_disconnect
+async def forget_bot_groups(bot: Bot):
+    group_registry.forget(bot.self_id)
+
+@scheduler.scheduled_job("interval", minutes=30)
+async def refresh_bot_groups():
+    await group_registry.refresh_all()
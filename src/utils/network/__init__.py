@@ -0,0 +1,266 @@
+from urllib.request import urlopen
+
+from nonebot.log import logger
+
+from src.utils.exceptions import RequestDataException, CircuitBreakerOpen
+from src.utils.decorators import ticket_required
+from src.utils.tuilan import generate_x_sk, generate_timestamp, format_request_body
+from src.utils.time import Time
+
+from .pool import ClientPool
+from .cache import response_cache, tuilan_cache_ttl
+from .flight import single_flight
+from .breaker import circuit_breaker
+from .limiter import rate_limiter, background
+
+import httpx
+import json
+import time
+import asyncio
+
+_background_tasks: set[asyncio.Task] = set()
+
+BREAKER_FALLBACK_TTL: int = 86400
+"""
+主机熔断时，允许返回过期多久以内的缓存，单位`seconds`。
+"""
+
+class Request:
+    def __init__(self, url: str, *, headers: dict = {}, params: str | dict = {}):
+        """
+        构造网络请求，亦可以请求本地内容。
+
+        Args:
+            url (str): 请求的目标`URL`。
+            headers (dict): 请求头。
+            params (dict, str): 请求体，当为`dict`时按`json`传参给`POST`请求，按`params`传参给`GET`请求；当为`str`时不可传入`GET`请求，按`data`传参给`POST`请求。
+        """
+        self.url = url
+        self.headers = headers 
+        self.params = params
+
+    async def get(self, expire_at: int = 0, timeout = 20, stale_ttl: int = 0, **kwargs) -> httpx.Response:
+        """
+        发送`GET`请求。
+
+        Args:
+            expire_at (int): 过期时间戳，在过期时间戳到达之前请求请求同一个地址均会使用第一次返回。
+            timeout (int): 超时时间，单位`seconds`，默认为`20`。
+            stale_ttl (int): 需配合`expire_at`使用，缓存过期后的`stale_ttl`秒内仍直接返回旧数据，同时在后台刷新缓存。
+
+        Returns:
+            response (httpx.Response): `httpx`响应类。
+        """
+        if isinstance(self.params, str):
+            raise RequestDataException("Method `GET` not accept argument `params` with type `str`!")
+        
+        key = response_cache.key("GET", self.url, self.params, self.headers)
+        if expire_at != 0:
+            cached = await response_cache.get(key, stale_ttl)
+            if cached is not None:
+                if cached.timestamp < Time().raw_time:
+                    self._revalidate(key, expire_at, timeout, **kwargs)
+                return response_cache.unpack(cached)
+
+        try:
+            return await single_flight.do(key, lambda: self._get(key, expire_at, timeout, **kwargs))
+        except CircuitBreakerOpen:
+            # 主机熔断时尽量返回过期的缓存
+            cached = await response_cache.get(key, BREAKER_FALLBACK_TTL) if expire_at != 0 else None
+            if cached is None:
+                raise
+            return response_cache.unpack(cached)
+    
+    async def post(self, tuilan: bool = False, timeout: int = 20) -> httpx.Response:
+        """
+        发送`POST`请求。
+
+        推栏请求在`TUILAN_CACHE_TTL`中列出的接口会按请求体（不含`ts`）缓存。
+
+        Args:
+            tuilan (bool): 是否为推栏请求，如果是则构造推栏请求。
+            timeout (int): 超时时间，单位秒（s）。
+        """
+        if not tuilan:
+            return await self._post(tuilan, timeout)
+        if not isinstance(self.params, dict):
+            raise ValueError("Cannot accept argument `params` without type `dict` when `tuilan` equal `True`.")
+        key = response_cache.key("POST", self.url, format_request_body(self._canonical_tuilan_params(self.params)))
+        ttl = tuilan_cache_ttl(self.url)
+        if ttl:
+            cached = await response_cache.get(key)
+            if cached is not None:
+                return response_cache.unpack(cached)
+        try:
+            return await single_flight.do(key, lambda: self._post(tuilan, timeout, key, ttl))
+        except CircuitBreakerOpen:
+            cached = await response_cache.get(key, BREAKER_FALLBACK_TTL) if ttl else None
+            if cached is None:
+                raise
+            return response_cache.unpack(cached)
+
+    async def _get(self, key: str, expire_at: int, timeout, **kwargs) -> httpx.Response:
+        response = await self._send("GET", timeout, url=self.url, params=self.params, headers=self.headers, **kwargs)
+
+        if expire_at != 0 and response.is_success:
+            response_cache.set(
+                key,
+                response_cache.pack(
+                    response,
+                    url=self.url,
+                    headers=self.headers,
+                    params=self.params,
+                    timestamp=expire_at
+                )
+            )
+
+        return response
+
+    async def _send(self, method: str, timeout, **kwargs) -> httpx.Response:
+        """
+        通过连接池发送请求，并记录目标主机的健康状态。
+
+        主机熔断时直接抛出`CircuitBreakerOpen`；超时时间会根据主机近期的耗时自适应缩短；
+        发送前按主机限流，后台请求（见`background`）让位于交互请求。
+        """
+        health = circuit_breaker.host(self.url)
+        if not health.allow():
+            raise CircuitBreakerOpen(f"Circuit breaker of `{health.host}` is open!")
+        if isinstance(timeout, (int, float)):
+            timeout = health.timeout(timeout)
+        client = ClientPool.get_client(self.url)
+        try:
+            async with rate_limiter.host(self.url):
+                start = time.perf_counter()
+                response = await client.request(method, timeout=timeout, **kwargs)
+                latency = time.perf_counter() - start
+        except httpx.TransportError:
+            health.record_failure()
+            raise
+        except BaseException:
+            health.release()
+            raise
+        if response.status_code >= 500:
+            health.record_failure()
+        else:
+            health.record_success(latency)
+        return response
+
+    def _revalidate(self, key: str, expire_at: int, timeout, **kwargs) -> None:
+        """
+        在后台刷新已过期的缓存，同一个键同时只会有一次刷新。
+        """
+        if single_flight.is_running(key):
+            return
+        task = asyncio.create_task(background(single_flight.do)(key, lambda: self._get(key, expire_at, timeout, **kwargs)))
+        _background_tasks.add(task)
+        task.add_done_callback(self._revalidated)
+
+    def _revalidated(self, task: asyncio.Task) -> None:
+        _background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"后台刷新缓存失败：{self.url} {task.exception()!r}")
+
+    async def _post(self, tuilan: bool, timeout: int, key: str = "", ttl: int = 0) -> httpx.Response:
+        if isinstance(self.params, str):
+            request_params = {
+                "url": self.url,
+                "data": self.params,
+                "headers": self.headers
+            }
+        else:
+            request_params = {
+                "url": self.url,
+                "json": self.params,
+                "headers": self.headers
+            }
+        if tuilan:
+            if not isinstance(self.params, dict):
+                raise ValueError("Cannot accept argument `params` without type `dict` when `tuilan` equal `True`.")
+            request_params: dict = self._build_tuilan_request(self.params)
+        response = await self._send("POST", timeout, **request_params)
+
+        if ttl and self._is_tuilan_success(response):
+            response_cache.set(
+                key,
+                response_cache.pack(
+                    response,
+                    url=self.url,
+                    params=self._canonical_tuilan_params(self.params), # type: ignore
+                    timestamp=Time().raw_time + ttl
+                )
+            )
+
+        return response
+
+    @staticmethod
+    def _canonical_tuilan_params(params: dict) -> dict:
+        """
+        去除推栏请求体中每次都会变化的`ts`字段，用于判断请求是否相同。
+        """
+        return {k: v for k, v in params.items() if k != "ts"}
+
+    @staticmethod
+    def _is_tuilan_success(response: httpx.Response) -> bool:
+        """
+        推栏接口出错时同样返回`200`，需要检查响应中的`code`。
+        """
+        if not response.is_success:
+            return False
+        try:
+            return response.json().get("code") == 0
+        except (json.JSONDecodeError, AttributeError):
+            return False
+        
+    @property
+    def local_content(self) -> bytes:
+        """
+        读取`File URL`的本地字节内容。
+        """
+        if not self.url.startswith("file"):
+            raise ValueError("Canot accept the argument `url` without one started with `file`!")
+        with urlopen(self.url) as f:
+            return f.read()
+    
+    @ticket_required
+    def _build_tuilan_request(self, params: dict, ticket: str = "") -> dict:
+        """
+        构造推栏请求。
+        
+        Args:
+            params (dict): 请求体，可不携带`ts`字段。
+            ticket (str): 推栏`Token`，需要通过一些方法获得，由装饰器进行填入，**调用时不要传入`ticket`**。
+
+        Returns:
+            arguments (dict): 关键字参数字典。
+        """
+        if params == {}:
+            params = {"ts": generate_timestamp()}
+        if "ts" not in params:
+            params["ts"] = generate_timestamp()
+        device_id = ticket.split("::")[-1]
+        params_ = format_request_body(params)
+        xsk = generate_x_sk(params_)
+        basic_headers = {
+            "Host": "m.pvp.xoyo.com",
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "fromsys": "APP",
+            "gamename": "jx3",
+            "Accept-Language": "zh-CN,zh-Hans;q=0.9",
+            "apiversion": "3",
+            "platform": "ios",
+            "token": ticket,
+            "deviceid": device_id,
+            "Cache-Control": "no-cache",
+            "clientkey": "1",
+            "User-Agent": "SeasunGame/202CFNetwork/1410.0.3Darwin/22.6.0",
+            "sign": "true",
+            "x-sk": xsk
+        }
+        request_params = {
+            "url": self.url,
+            "data": params_,
+            "headers": basic_headers
+        }
+        return request_params
@@ -0,0 +1,119 @@
+from collections import deque
+from typing import Literal
+
+from .pool import ClientPool
+
+import time
+
+class HostHealth:
+    """
+    单个主机的健康状态，包括熔断器与自适应超时。
+
+    熔断器在连续失败`failure_threshold`次后断开（`open`），期间请求直接失败；
+    经过`recovery_time`秒后进入半开（`half_open`）状态，仅放行一个探测请求，成功则恢复，失败则重新断开。
+    """
+    failure_threshold: int = 5
+    recovery_time: float = 30
+    min_samples: int = 20
+    min_timeout: float = 3
+    timeout_factor: float = 4
+
+    def __init__(self, host: str):
+        self.host = host
+        self.state: Literal["closed", "open", "half_open"] = "closed"
+        self.failures = 0
+        self.total_failures = 0
+        self.total_requests = 0
+        self.opened_at: float = 0
+        self.probing = False
+        self.latencies: deque[float] = deque(maxlen=200)
+
+    @property
+    def is_open(self) -> bool:
+        """
+        熔断器是否断开且尚未到达探测时间。
+        """
+        return self.state == "open" and time.monotonic() - self.opened_at < self.recovery_time
+
+    def allow(self) -> bool:
+        """
+        判断是否放行一次请求，半开状态下会占用唯一的探测名额。
+        """
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if self.is_open:
+                return False
+            self.state = "half_open"
+        if self.probing:
+            return False
+        self.probing = True
+        return True
+
+    def percentile(self, percent: float) -> float | None:
+        """
+        近期成功请求耗时的百分位数，单位`seconds`，样本不足时为`None`。
+        """
+        if len(self.latencies) < self.min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    def timeout(self, default: float) -> float:
+        """
+        根据近期`p95`耗时计算超时时间，不会超过调用方给出的超时时间。
+
+        Args:
+            default (float): 调用方给出的超时时间。
+        """
+        p95 = self.percentile(95)
+        if p95 is None:
+            return default
+        return min(default, max(self.min_timeout, p95 * self.timeout_factor))
+
+    def record_success(self, latency: float):
+        self.total_requests += 1
+        self.latencies.append(latency)
+        self.failures = 0
+        self.probing = False
+        self.state = "closed"
+
+    def record_failure(self):
+        self.total_requests += 1
+        self.total_failures += 1
+        self.failures += 1
+        self.probing = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """
+        请求被取消时释放探测名额，不计入成功或失败。
+        """
+        self.probing = False
+
+class CircuitBreaker:
+    """
+    按主机记录健康状态。
+    """
+    def __init__(self):
+        self._hosts: dict[str, HostHealth] = {}
+
+    def host(self, url: str) -> HostHealth:
+        """
+        获取`URL`所在主机的健康状态。
+
+        Args:
+            url (str): 请求的目标`URL`。
+        """
+        host = ClientPool.host_of(url)
+        health = self._hosts.get(host)
+        if health is None:
+            health = self._hosts[host] = HostHealth(host)
+        return health
+
+    def hosts(self) -> list[HostHealth]:
+        return list(self._hosts.values())
+
+circuit_breaker = CircuitBreaker()
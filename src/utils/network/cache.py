@@ -0,0 +1,275 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any
+from urllib.parse import urlsplit
+
+from nonebot import get_driver
+
+from src.utils.database import cache_db
+from src.utils.database.classes import RequestData
+from src.utils.time import Time
+
+import zlib
+import httpx
+import asyncio
+import hashlib
+import json
+
+TUILAN_CACHE_TTL: dict[str, int] = {
+    "/dungeon/list": 86400,
+    "/dungeon/info": 86400,
+    "/dungeon/boss-drop": 86400,
+    "/achievement/list/dungeon-maps": 86400,
+    "/force/gest": 86400,
+    "/achievement/list/achievements": 300,
+    "/role/indicator": 300,
+    "/mine/equip/get-role-equip": 300
+}
+"""
+推栏`POST`接口的缓存时间，单位`seconds`，未列出的接口不缓存。
+"""
+
+def tuilan_cache_ttl(url: str) -> int:
+    """
+    获取推栏接口的缓存时间。
+
+    Args:
+        url (str): 推栏接口的`URL`。
+
+    Returns:
+        ttl (int): 缓存时间，单位`seconds`，为`0`时不缓存。
+    """
+    return TUILAN_CACHE_TTL.get(urlsplit(url).path.rstrip("/"), 0)
+
+class ResponseCache:
+    """
+    两级响应缓存。
+
+    第一级为进程内有界`LRU`，同时限制条目数与响应体的总字节数，条目在`timestamp`（即`expire_at`）到达前有效；
+    第二级为`cache_db`中的`request_data`表，写入会先在内存中合并，稍后批量落盘（`write-behind`），重启后仍可命中。
+    """
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        maxbytes: int = 64 * 1024 * 1024,
+        max_entry_bytes: int = 1024 * 1024,
+        flush_interval: float = 1.0
+    ):
+        """
+        Args:
+            maxsize (int): 内存中最多保留的条目数，超出后淘汰最久未使用的条目。
+            maxbytes (int): 内存中响应体的总字节数上限，超出后淘汰最久未使用的条目。
+            max_entry_bytes (int): 单个响应体超过该字节数时只缓存到`cache_db`，不进入内存。
+            flush_interval (float): 写入落盘的延迟，单位`seconds`。
+        """
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.max_entry_bytes = max_entry_bytes
+        self.flush_interval = flush_interval
+        self._entries: OrderedDict[str, RequestData] = OrderedDict()
+        self._bytes = 0
+        self._pending: dict[str, RequestData] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def key(cls, method: str, url: str, params: Any = None, headers: dict | None = None) -> str:
+        """
+        构造缓存键，同时用作合并并发请求的键。
+
+        Args:
+            method (str): 请求方法。
+            url (str): 请求的目标`URL`。
+            params (Any): 请求参数，按键排序后参与计算。
+            headers (dict, None): 请求头，其中`CREDENTIAL_HEADERS`列出的头部参与计算，不同身份的请求不会共享响应。
+
+        Returns:
+            key (str): 缓存键。
+        """
+        credentials = {
+            k.lower(): v
+            for k, v
+            in (headers or {}).items()
+            if k.lower() in cls.CREDENTIAL_HEADERS
+        }
+        raw = json.dumps([method.upper(), url, params] + ([credentials] if credentials else []), sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def pack(cls, response: httpx.Response, **kwargs: Any) -> RequestData:
+        """
+        将响应打包为可缓存的数据，响应体按原始字节保存，超过`COMPRESS_THRESHOLD`时使用`zlib`压缩。
+
+        Args:
+            response (httpx.Response): 需要缓存的响应。
+            **kwargs (Any): `RequestData`的其他字段，如`url`、`timestamp`。
+
+        Returns:
+            data (RequestData): 缓存数据。
+        """
+        content = response.content
+        encoding = ""
+        if len(content) >= cls.COMPRESS_THRESHOLD:
+            compressed = zlib.compress(content, cls.COMPRESS_LEVEL)
+            if len(compressed) < len(content):
+                content, encoding = compressed, "zlib"
+        headers = {
+            k: v
+            for k, v
+            in response.headers.items()
+            if k.lower() not in cls.DROPPED_HEADERS
+        }
+        return RequestData(
+            status_code=response.status_code,
+            content_type=response.headers.get("content-type", ""),
+            response_headers=headers,
+            encoding=encoding,
+            content=content,
+            **kwargs
+        )
+
+    @staticmethod
+    def unpack(data: RequestData) -> httpx.Response:
+        """
+        从缓存数据还原响应。
+
+        Args:
+            data (RequestData): 缓存数据。
+
+        Returns:
+            response (httpx.Response): 与原始响应状态码、响应头、响应体一致的响应。
+        """
+        content = zlib.decompress(data.content) if data.encoding == "zlib" else data.content
+        return httpx.Response(status_code=data.status_code, headers=data.response_headers, content=content)
+
+    async def get(self, key: str, stale_ttl: int = 0) -> RequestData | None:
+        """
+        查询缓存，内存未命中时回落到`cache_db`。
+
+        Args:
+            key (str): 缓存键。
+            stale_ttl (int): 过期后仍可返回的时长，单位`seconds`，默认不返回过期缓存。
+
+        Returns:
+            data (RequestData, None): 缓存数据，不存在或过期超过`stale_ttl`时为`None`。
+        """
+        now = Time().raw_time
+        data = self._entries.get(key)
+        if data is not None:
+            if data.timestamp + stale_ttl >= now:
+                self._entries.move_to_end(key)
+                self._count_hit(data, now, "hits")
+                return data
+            # 内存中的条目总是最新的，磁盘上不会有更新的数据
+            self.misses += 1
+            return None
+        data = self._pending.get(key)
+        if data is None:
+            data = await cache_db.a_where_one(RequestData(), "key = ? AND timestamp >= ? AND status_code > 0", key, now - stale_ttl, default=None)
+        if data is None or data.timestamp + stale_ttl < now:
+            self.misses += 1
+            return None
+        self._count_hit(data, now, "disk_hits")
+        self._remember(key, data)
+        return data
+
+    def set(self, key: str, data: RequestData) -> None:
+        """
+        写入缓存，`cache_db`的写入会延迟批量进行。
+
+        Args:
+            key (str): 缓存键。
+            data (RequestData): 缓存数据，`timestamp`为过期时间戳。
+        """
+        data.key = key
+        self._remember(key, data)
+        self._pending[key] = data
+        if self._flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.flush()
+            else:
+                self._flush_handle = loop.call_later(self.flush_interval, self.flush)
+
+    def flush(self) -> Future | None:
+        """
+        将尚未落盘的缓存交给`cache_db`的写线程写入。
+
+        Returns:
+            future (Future, None): 写入完成时完成，没有待写入的缓存时为`None`。
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending = list(self._pending.values())
+        self._pending.clear()
+        if pending:
+            return cache_db.submit(self._write, pending)
+        return None
+
+    @staticmethod
+    def _write(pending: list[RequestData]) -> None:
+        with cache_db.transaction():
+            for data in pending:
+                cache_db.delete(RequestData(), "key = ?", data.key)
+            cache_db.save_many(pending)
+
+    def stats(self) -> dict[str, int]:
+        """
+        缓存计数器。
+        """
+        return {
+            "size": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+    def _count_hit(self, data: RequestData, now: int, counter: str) -> None:
+        if data.timestamp < now:
+            self.stale_hits += 1
+        else:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _remember(self, key: str, data: RequestData) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old.content)
+        if len(data.content) > self.max_entry_bytes:
+            return
+        self._entries[key] = data
+        self._bytes += len(data.content)
+        while len(self._entries) > self.maxsize or self._bytes > self.maxbytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.content)
+            self.evictions += 1
+
+    COMPRESS_THRESHOLD = 1024
+    COMPRESS_LEVEL = 6
+    CREDENTIAL_HEADERS = ("authorization", "proxy-authorization", "cookie")
+    """
+    代表请求身份的头部。
+    """
+    DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+    """
+    响应体已经解码，这些头部不再与缓存的内容对应。
+    """
+
+response_cache = ResponseCache()
+
+driver = get_driver()
+
+@driver.on_shutdown
+async def flush_response_cache():
+    future = response_cache.flush()
+    if future is not None:
+        await asyncio.wrap_future(future)
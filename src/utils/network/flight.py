@@ -0,0 +1,51 @@
+from typing import Awaitable, Callable, TypeVar
+
+import asyncio
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """
+    合并相同的并发请求。
+
+    同一个键在执行期间的后续调用不会再次执行，而是等待第一次调用的结果。
+    """
+    def __init__(self):
+        self._calls: dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        执行或等待与`key`对应的调用。
+
+        Args:
+            key (str): 调用的标识，相同的键视为相同的请求。
+            func (Callable[[], Awaitable[T]]): 实际执行的协程函数，仅在没有进行中的调用时执行。
+
+        Returns:
+            result (T): 调用结果，异常同样会传递给所有等待者。
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        # 某个调用者被取消时不应影响其他等待者
+        return await asyncio.shield(task)
+
+    def is_running(self, key: str) -> bool:
+        """
+        `key`对应的调用是否正在进行。
+        """
+        return key in self._calls
+
+    def in_flight(self) -> int:
+        """
+        当前正在进行的调用数量。
+        """
+        return len(self._calls)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+single_flight = SingleFlight()
@@ -0,0 +1,147 @@
+from contextvars import ContextVar
+from functools import wraps
+from urllib.parse import urlsplit
+
+from src.config import Config, HostLimit
+
+from .pool import ClientPool
+
+import time
+import heapq
+import asyncio
+import itertools
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+request_priority: ContextVar[int] = ContextVar("request_priority", default=INTERACTIVE)
+"""
+当前上下文发出请求的优先级，数值越小越优先。
+"""
+
+def background(func):
+    """
+    将协程函数内发出的请求标记为后台请求，在限流排队时让位于交互请求。
+
+    用于定时推送、轮询等不需要立即回复用户的任务。
+    """
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = request_priority.set(BACKGROUND)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            request_priority.reset(token)
+    return wrapper
+
+class HostLimiter:
+    """
+    单个主机的令牌桶与并发上限。
+
+    令牌以`rate`每秒的速度补充，最多积累`burst`个；同时进行中的请求不超过`concurrency`个。
+    排队的请求按优先级唤醒，同一优先级先到先得。
+    """
+    def __init__(self, limit: HostLimit):
+        self.rate = limit.rate
+        self.burst = limit.burst
+        self.concurrency = limit.concurrency
+        self.tokens: float = limit.burst
+        self.active = 0
+        self._updated = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, priority: int = INTERACTIVE):
+        """
+        获取一次请求的名额，必要时排队等待。
+
+        Args:
+            priority (int): 请求优先级，`INTERACTIVE`优先于`BACKGROUND`。
+        """
+        if not self._waiters and self._take():
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self._wake()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 已经分配到名额但调用方被取消，归还名额
+                self.release()
+            raise
+
+    def release(self):
+        """
+        请求结束，释放并发名额。
+        """
+        self.active -= 1
+        self._wake()
+
+    async def __aenter__(self):
+        await self.acquire(request_priority.get())
+        return self
+
+    async def __aexit__(self, *_):
+        self.release()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take(self) -> bool:
+        self._refill()
+        if self.active >= self.concurrency or self.tokens < 1:
+            return False
+        self.tokens -= 1
+        self.active += 1
+        return True
+
+    def _wake(self):
+        while self._waiters:
+            future = self._waiters[0][2]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._take():
+                break
+            heapq.heappop(self._waiters)
+            future.set_result(None)
+        if self._waiters and self.active < self.concurrency and self._timer is None:
+            # 受限于令牌数量，等到下一个令牌补充后再唤醒
+            delay = max(0.0, (1 - self.tokens) / self.rate)
+            self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        self._wake()
+
+class RateLimiter:
+    """
+    按主机管理`HostLimiter`，限制参数来自配置文件的`network.limits`。
+    """
+    def __init__(self):
+        self._hosts: dict[str, HostLimiter] = {}
+
+    def host(self, url: str) -> HostLimiter:
+        """
+        获取`URL`所在主机的限流器。
+
+        Args:
+            url (str): 请求的目标`URL`。
+        """
+        host = ClientPool.host_of(url)
+        limiter = self._hosts.get(host)
+        if limiter is None:
+            limits = Config.network.limits
+            limit = limits.get(urlsplit(url).hostname or "") or limits.get("default") or HostLimit()
+            limiter = self._hosts[host] = HostLimiter(limit)
+        return limiter
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,102 @@
+from http.cookiejar import CookieJar
+from urllib.parse import urlsplit
+
+from nonebot import get_driver
+from nonebot.log import logger
+
+from .transport import build_transport
+
+import httpx
+import importlib.util
+
+HTTP2_AVAILABLE: bool = importlib.util.find_spec("h2") is not None
+
+class NoCookieJar(CookieJar):
+    """
+    不保存响应`Set-Cookie`的`CookieJar`。
+
+    客户端在不同调用方之间共享，保存的`Cookie`会被附加到其他调用方的请求上；
+    调用方需要`Cookie`时应在每次请求中自行传入。
+    """
+    def extract_cookies(self, response, request):
+        pass
+
+    def set_cookie_if_ok(self, cookie, request):
+        pass
+
+class ClientPool:
+    """
+    进程级`httpx.AsyncClient`连接池。
+
+    每个主机（`scheme://host:port`）持有一个独立的客户端，连接在请求之间保持复用（`keep-alive`），
+    在安装了`h2`时优先协商`HTTP/2`，从而避免每次请求都重新进行`TCP`与`TLS`握手。
+    传输层可按配置切换为录制或回放模式，见`src.utils.network.transport`。
+    """
+    _clients: dict[str, httpx.AsyncClient] = {}
+
+    limits = httpx.Limits(
+        max_connections=16, # 单个主机的最大连接数
+        max_keepalive_connections=8, # 单个主机保持空闲的最大连接数
+        keepalive_expiry=60
+    )
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        """
+        获取`URL`对应的连接池键。
+
+        Args:
+            url (str): 请求的目标`URL`。
+
+        Returns:
+            host (str): 形如`https://m.pvp.xoyo.com`的主机标识。
+        """
+        parsed = urlsplit(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    @classmethod
+    def get_client(cls, url: str) -> httpx.AsyncClient:
+        """
+        获取目标`URL`所在主机的客户端，不存在时创建。
+
+        Args:
+            url (str): 请求的目标`URL`。
+
+        Returns:
+            client (httpx.AsyncClient): 复用的客户端。
+        """
+        host = cls.host_of(url)
+        client = cls._clients.get(host)
+        if client is None or client.is_closed:
+            transport = httpx.AsyncHTTPTransport(
+                verify=False,
+                http2=HTTP2_AVAILABLE,
+                limits=cls.limits
+            )
+            client = httpx.AsyncClient(
+                follow_redirects=True,
+                verify=False,
+                cookies=NoCookieJar(),
+                transport=build_transport(transport)
+            )
+            cls._clients[host] = client
+        return client
+
+    @classmethod
+    async def close(cls):
+        """
+        关闭所有客户端并释放连接。
+        """
+        clients = list(cls._clients.values())
+        cls._clients.clear()
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"关闭 HTTP 客户端时出现错误：{e}")
+
+driver = get_driver()
+
+@driver.on_shutdown
+async def close_client_pool():
+    await ClientPool.close()
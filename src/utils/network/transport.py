@@ -0,0 +1,133 @@
+from pathlib import Path
+from typing import Literal
+
+from nonebot.log import logger
+
+from src.config import Config
+from src.const.path import DATA, build_path
+
+import os
+import json
+import time
+import base64
+import asyncio
+import hashlib
+import httpx
+
+TransportMode = Literal["passthrough", "record", "replay"]
+
+VOLATILE_FIELDS = ("ts", "sign")
+"""
+请求体中每次都会变化的字段，不参与录制文件的匹配。
+"""
+
+def fixture_key(request: httpx.Request) -> str:
+    """
+    计算请求对应的录制文件名。
+
+    Args:
+        request (httpx.Request): 请求。
+
+    Returns:
+        key (str): 由请求方法、完整`URL`与请求体（去除`VOLATILE_FIELDS`）计算的摘要。
+    """
+    body = request.content
+    try:
+        data = json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        canonical = body.decode("utf-8", errors="replace")
+    else:
+        if isinstance(data, dict):
+            data = {k: v for k, v in data.items() if k not in VOLATILE_FIELDS}
+        canonical = json.dumps(data, sort_keys=True, ensure_ascii=False)
+    raw = json.dumps([request.method, str(request.url), canonical], ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+class RecordTransport(httpx.AsyncBaseTransport):
+    """
+    正常发送请求，同时将响应录制到`fixtures`目录。
+    """
+    def __init__(self, transport: httpx.AsyncBaseTransport, fixtures: str):
+        self.transport = transport
+        self.fixtures = Path(fixtures)
+        self.fixtures.mkdir(parents=True, exist_ok=True)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        response = await self.transport.handle_async_request(request)
+        try:
+            content = b"".join([chunk async for chunk in response.stream]) # type: ignore
+        finally:
+            await response.aclose()
+        elapsed = time.perf_counter() - start
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() != "transfer-encoding"]
+        fixture = {
+            "method": request.method,
+            "url": str(request.url),
+            "status_code": response.status_code,
+            "headers": headers,
+            "content": base64.b64encode(content).decode("ascii"),
+            "elapsed": elapsed
+        }
+        path = self.fixtures / (fixture_key(request) + ".json")
+        path.write_text(json.dumps(fixture, ensure_ascii=False), encoding="utf-8")
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    从`fixtures`目录回放已录制的响应，不访问网络。
+    """
+    def __init__(self, fixtures: str, latency: float | None = None):
+        """
+        Args:
+            fixtures (str): 录制文件所在目录。
+            latency (float, None): 每次回放前等待的时间，单位`seconds`；为`None`时使用录制时的实际耗时。
+        """
+        self.fixtures = Path(fixtures)
+        self.latency = latency
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        path = self.fixtures / (fixture_key(request) + ".json")
+        if not path.exists():
+            logger.warning(f"没有找到录制的响应：{request.method} {request.url}")
+            raise httpx.ConnectError(f"No recorded response for {request.method} {request.url}", request=request)
+        fixture = json.loads(path.read_text(encoding="utf-8"))
+        delay = fixture.get("elapsed", 0) if self.latency is None else self.latency
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return httpx.Response(
+            fixture["status_code"],
+            headers=fixture["headers"],
+            content=base64.b64decode(fixture["content"]),
+            request=request
+        )
+
+def transport_mode() -> TransportMode:
+    """
+    当前的传输模式，环境变量`INKAR_NETWORK_MODE`优先于配置文件。
+    """
+    mode = os.environ.get("INKAR_NETWORK_MODE") or Config.network.transport.mode
+    if mode not in ("passthrough", "record", "replay"):
+        raise ValueError(f"Unknown network transport mode `{mode}`!")
+    return mode # type: ignore
+
+def build_transport(transport: httpx.AsyncBaseTransport) -> httpx.AsyncBaseTransport:
+    """
+    按传输模式包装真实的传输层。
+
+    环境变量`INKAR_NETWORK_FIXTURES`、`INKAR_NETWORK_LATENCY`分别覆盖配置文件中的录制目录与回放延迟。
+
+    Args:
+        transport (httpx.AsyncBaseTransport): 真实发送请求的传输层。
+    """
+    mode = transport_mode()
+    fixtures = os.environ.get("INKAR_NETWORK_FIXTURES") or Config.network.transport.fixtures or build_path(DATA, ["fixtures"])
+    if mode == "record":
+        return RecordTransport(transport, fixtures)
+    if mode == "replay":
+        latency = os.environ.get("INKAR_NETWORK_LATENCY")
+        return ReplayTransport(fixtures, float(latency) if latency else Config.network.transport.latency)
+    return transport
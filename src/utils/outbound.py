@@ -0,0 +1,193 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+from nonebot.log import logger
+from nonebot.adapters import Bot
+from nonebot.exception import ActionFailed, ApiNotAvailable, NetworkError, WebSocketClosed
+
+from src.config import Config
+from src.utils.network.limiter import HostLimiter, request_priority
+
+import time
+import httpx
+import asyncio
+
+@dataclass
+class Batch:
+    """
+    同一机器人、群聊与优先级下排队中的纯文本消息，由第一条消息的调用者取得名额后合并发送。
+    """
+    messages: list[str]
+    future: asyncio.Future
+
+class OutboundQueue:
+    """
+    群聊消息的统一发送队列。
+
+    每条消息依次取得所在群聊与发送账号的令牌桶名额后发送，排队时按优先级唤醒，交互回复（`INTERACTIVE`）先于订阅推送（`BACKGROUND`）。
+    同一群聊仍在排队的纯文本消息最多合并`message.batch`条，以换行连接后作为一条消息发送。
+    消息确定没有发出时（见`retriable`）按配置文件的`message.retries`与`message.backoff`指数退避重试，重试等待期间不占用名额；
+    `ActionFailed`（如被禁言、不在群内）记录后丢弃，超时等可能已经发出的失败不重试，避免重复发送。
+    """
+    def __init__(self):
+        self._bots: dict[str, HostLimiter] = {}
+        self._groups: dict[int, HostLimiter] = {}
+        self._batches: dict[tuple[str, int, int], Batch] = {}
+        self.latencies: deque[float] = deque(maxlen=200)
+        self.waiting = 0
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.batched = 0
+
+    def bot(self, bot_id: str) -> HostLimiter:
+        limiter = self._bots.get(bot_id)
+        if limiter is None:
+            limiter = self._bots[bot_id] = HostLimiter(Config.message.bot)
+        return limiter
+
+    def group(self, group_id: int) -> HostLimiter:
+        limiter = self._groups.get(group_id)
+        if limiter is None:
+            limiter = self._groups[group_id] = HostLimiter(Config.message.group)
+        return limiter
+
+    async def send_group_msg(self, bot: Bot, group_id: int, message: Any, priority: int | None = None) -> Any:
+        """
+        发送群聊消息，必要时排队等待。
+
+        Args:
+            bot (Bot): 发送消息的机器人。
+            group_id (int): 群号。
+            message (Any): 消息内容，与`send_group_msg`的`message`参数相同。
+            priority (int, None): 优先级，为`None`时使用当前上下文的请求优先级。
+
+        Returns:
+            result (Any): `send_group_msg`的返回值，`ActionFailed`时为`None`，其他失败抛出最后一次的异常；合并发送的消息共享同一结果。
+        """
+        if priority is None:
+            priority = request_priority.get()
+        if not isinstance(message, str) or Config.message.batch <= 1:
+            return await self._send(bot, group_id, lambda: message, priority)
+
+        key = (bot.self_id, group_id, priority)
+        batch = self._batches.get(key)
+        if batch is not None and len(batch.messages) < Config.message.batch:
+            batch.messages.append(message)
+            self.batched += 1
+            self.waiting += 1
+            try:
+                return await asyncio.shield(batch.future)
+            finally:
+                self.waiting -= 1
+
+        batch = self._batches[key] = Batch([message], asyncio.get_running_loop().create_future())
+        # 没有其他消息等待结果时，避免未读取的异常产生警告
+        batch.future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+        def take() -> str:
+            # 取得名额后不再接受新的消息
+            if self._batches.get(key) is batch:
+                del self._batches[key]
+            return "\n".join(batch.messages)
+
+        try:
+            result = await self._send(bot, group_id, take, priority)
+        except asyncio.CancelledError:
+            take()
+            batch.future.cancel()
+            raise
+        except Exception as e:
+            batch.future.set_exception(e)
+            raise
+        batch.future.set_result(result)
+        return result
+
+    async def _send(self, bot: Bot, group_id: int, take: Callable[[], Any], priority: int) -> Any:
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            self.waiting += 1
+            try:
+                group = self.group(group_id)
+                await group.acquire(priority)
+                try:
+                    sender = self.bot(bot.self_id)
+                    await sender.acquire(priority)
+                    self.waiting -= 1
+                    try:
+                        result = await bot.call_api("send_group_msg", group_id=group_id, message=take())
+                    finally:
+                        self.waiting += 1
+                        sender.release()
+                finally:
+                    group.release()
+            except ActionFailed as e:
+                self.failed += 1
+                logger.warning(f"{bot.self_id} 向群聊 {group_id} 发送消息被拒绝，已丢弃：{e!r}")
+                return None
+            except Exception as e:
+                if not self.retriable(e) or attempt >= Config.message.retries:
+                    self.failed += 1
+                    logger.warning(f"{bot.self_id} 向群聊 {group_id} 发送消息失败：{e!r}")
+                    raise
+                attempt += 1
+                self.retried += 1
+                await asyncio.sleep(Config.message.backoff * 2 ** (attempt - 1))
+            else:
+                self.sent += 1
+                self.latencies.append(time.monotonic() - start)
+                return result
+            finally:
+                self.waiting -= 1
+
+    async def send_many(self, messages: Iterable[tuple[Bot, int, Any]], priority: int | None = None) -> list[Any]:
+        """
+        批量发送群聊消息，各条消息并发排队，单条失败不影响其他消息。
+
+        Args:
+            messages (Iterable[tuple[Bot, int, Any]]): 机器人、群号与消息内容。
+            priority (int, None): 优先级，为`None`时使用当前上下文的请求优先级。
+
+        Returns:
+            results (list[Any]): 每条消息的返回值或异常，顺序与传入顺序一致。
+        """
+        return await asyncio.gather(
+            *[self.send_group_msg(bot, group_id, message, priority) for bot, group_id, message in messages],
+            return_exceptions=True
+        )
+
+    @staticmethod
+    def retriable(exception: Exception) -> bool:
+        """
+        判断失败是否可以重试，只有确定消息没有发出的失败才重试。
+
+        包括机器人未连接、发送前连接已断开，以及`HTTP`连接未建立；
+        `WebSocket`超时等情况下消息可能已经发出，不重试。
+        """
+        if isinstance(exception, (ApiNotAvailable, WebSocketClosed)):
+            return True
+        if isinstance(exception, NetworkError):
+            return isinstance(exception.__cause__, (ConnectionError, httpx.ConnectError))
+        return False
+
+    def percentile(self, percent: float) -> float | None:
+        """
+        近期消息从入队到发送完成的耗时百分位数，单位`seconds`，没有样本时为`None`。
+        """
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "waiting": self.waiting,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "batched": self.batched
+        }
+
+outbound_queue = OutboundQueue()
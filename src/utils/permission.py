@@ -1,7 +1,4 @@
-from typing import Any
-
-from src.utils.database.classes import Account
-from src.utils.database import db
+from src.utils.database.buffer import account_buffer
 
 def check_permission(user_id: str | int, level: str | int) -> bool:
     """
@@ -11,8 +8,7 @@ def check_permission(user_id: str | int, level: str | int) -> bool:
         user_id (str, int): 用户`uin`。
         level (str, int): 至少需达到的权限等级。
     """
-    data: Account | Any = db.where_one(Account(), "user_id = ?", int(user_id), default=Account())
-    return data.permission >= int(level)
+    return account_buffer.get(int(user_id)).permission >= int(level)
 
 def denied(level: int | str) -> str:
     """
@@ -0,0 +1,24 @@
+from pathlib import Path
+
+import os
+import sys
+import shutil
+import tempfile
+
+import nonebot
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# `src.const.path`以工作目录为基准计算数据与配置目录，切换到临时目录后测试不会触碰`src/data`
+WORKDIR = tempfile.TemporaryDirectory(prefix="inkar-test-")
+config = ROOT / "src" / "config" / "config.yml"
+os.makedirs(Path(WORKDIR.name) / "src" / "config")
+shutil.copy(config if config.exists() else ROOT / "src" / "assets" / "source" / "config.yml", Path(WORKDIR.name) / "src" / "config" / "config.yml")
+sys.path.insert(0, str(ROOT))
+os.chdir(WORKDIR.name)
+
+nonebot.init()
+
+def pytest_unconfigure(config):
+    os.chdir(ROOT)
+    WORKDIR.cleanup()
@@ -0,0 +1,6 @@
+from src.config import NetworkConfig
+
+def test_builtin_host_limits_apply_to_existing_configs():
+    limits = NetworkConfig.model_validate({"limits": {"default": {"rate": 1}}}).limits
+    assert limits["default"].rate == 1
+    assert limits["m.pvp.xoyo.com"].concurrency == 4
@@ -0,0 +1,45 @@
+import asyncio
+
+from src.utils.database import cache_db
+from src.utils.database.buffer import group_message_buffer
+from src.utils.database.classes import GroupMessage, MemberMessage
+from src.utils.database.lib import Database
+from src.utils.database.maintenance import maintain_cache_db
+from src.utils.time import Time
+
+def test_maintenance_is_not_undone_by_a_buffered_row():
+    now = Time().raw_time
+
+    async def run():
+        model = await group_message_buffer.a_get(1, 2)
+        model.messages = [MemberMessage(timestamp=1), MemberMessage(timestamp=now)]
+        group_message_buffer.put(model)
+        await group_message_buffer.a_flush()
+
+        # 维护前读取的记录，维护后修改并写回
+        model = await group_message_buffer.a_get(1, 2)
+        await maintain_cache_db()
+        model.messages.append(MemberMessage(timestamp=now + 1))
+        group_message_buffer.put(model)
+        await group_message_buffer.a_flush()
+
+    asyncio.run(run())
+    row: GroupMessage = cache_db.where_one(GroupMessage(), "group_id = ? AND user_id = ?", 1, 2) # type: ignore
+    assert [m.timestamp for m in row.messages] == [now, now + 1]
+
+def test_duplicate_group_message_rows_are_merged_before_the_unique_index(tmp_path):
+    database = Database(str(tmp_path / "merge.db"))
+    database.auto_migrate(GroupMessage())
+    database.cursor.execute('DROP INDEX "uidx_group_message_group_id_user_id"')
+    # 同一份记录在不同时刻的快照，以及另一个成员的记录
+    database.save(
+        GroupMessage(group_id=1, user_id=2, messages=[MemberMessage(timestamp=10)]),
+        GroupMessage(group_id=1, user_id=2, messages=[MemberMessage(timestamp=10), MemberMessage(timestamp=20)]),
+        GroupMessage(group_id=1, user_id=2, messages=[MemberMessage(timestamp=5)]),
+        GroupMessage(group_id=1, user_id=3, messages=[MemberMessage(timestamp=7)])
+    )
+    database.auto_migrate(GroupMessage())
+
+    rows: list[GroupMessage] = database.where_all(GroupMessage(), "1 ORDER BY id", default=[]) # type: ignore
+    assert [(row.id, row.user_id, [m.timestamp for m in row.messages]) for row in rows] == [(1, 2, [5, 10, 20]), (4, 3, [7])]
+    database.close()
@@ -0,0 +1,45 @@
+import httpx
+import asyncio
+
+from src.utils.network import pool
+from src.utils.network.pool import ClientPool
+
+def test_pooled_client_does_not_share_cookies(monkeypatch):
+    received = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(request.headers.get("cookie"))
+        return httpx.Response(200, headers={"set-cookie": "session=alice; Path=/"})
+
+    monkeypatch.setattr(pool.httpx, "AsyncHTTPTransport", lambda **kwargs: httpx.MockTransport(handler))
+    monkeypatch.setattr(ClientPool, "_clients", {})
+
+    async def run():
+        client = ClientPool.get_client("https://cookie.test/login")
+        await client.get("https://cookie.test/login")
+        await client.get("https://cookie.test/profile")
+        await client.aclose()
+
+    asyncio.run(run())
+    assert received == [None, None]
+
+def test_concurrent_gets_with_different_credentials_are_not_coalesced(monkeypatch):
+    from src.utils.network import Request
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, text=request.headers.get("cookie", ""))
+
+    monkeypatch.setattr(pool.httpx, "AsyncHTTPTransport", lambda **kwargs: httpx.MockTransport(handler))
+    monkeypatch.setattr(ClientPool, "_clients", {})
+
+    async def run():
+        responses = await asyncio.gather(
+            Request("https://flight.test/count", headers={"Cookie": "p_uin=1"}).get(),
+            Request("https://flight.test/count", headers={"Cookie": "p_uin=2"}).get(),
+            Request("https://flight.test/count", headers={"Cookie": "p_uin=2"}).get()
+        )
+        await ClientPool.close()
+        return [response.text for response in responses]
+
+    assert asyncio.run(run()) == ["p_uin=1", "p_uin=2", "p_uin=2"]
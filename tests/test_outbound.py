@@ -0,0 +1,34 @@
+import asyncio
+
+from src.config import Config, HostLimit
+from src.utils.network.limiter import BACKGROUND
+from src.utils.outbound import OutboundQueue
+
+class FakeBot:
+    self_id = "10000"
+
+    def __init__(self):
+        self.sent: list[tuple[int, str]] = []
+
+    async def call_api(self, api: str, **data):
+        await asyncio.sleep(0.01)
+        self.sent.append((data["group_id"], data["message"]))
+        return {"message_id": len(self.sent)}
+
+def test_queued_text_messages_for_one_group_are_batched(monkeypatch):
+    monkeypatch.setattr(Config.message, "group", HostLimit(rate=1000, burst=1000, concurrency=1))
+    monkeypatch.setattr(Config.message, "batch", 3)
+    queue = OutboundQueue()
+    bot = FakeBot()
+
+    async def run():
+        return await queue.send_many(
+            [(bot, 1, f"m{i}") for i in range(6)] + [(bot, 2, "other")],
+            BACKGROUND
+        )
+
+    results = asyncio.run(run())
+    # 第一条立即发送，其余消息在排队期间按每批 3 条合并
+    assert bot.sent == [(1, "m0"), (2, "other"), (1, "m1\nm2\nm3"), (1, "m4\nm5")]
+    assert [result["message_id"] for result in results] == [1, 3, 3, 3, 4, 4, 2]
+    assert queue.stats()["batched"] == 3